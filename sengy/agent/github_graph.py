@@ -34,7 +34,7 @@ class GitHubGraph(Agent):
         
         # Add PowerGitHubToolkit if GitHub tools not already present
         github_tool_names = {
-            "get_github_commits", "get_github_pull_requests", 
+            "get_github_commits", "get_github_commits_many", "get_github_pull_requests", 
             "get_github_commit_details", "get_github_pr_details"
         }
         
@@ -344,9 +344,35 @@ def reload_settings() -> SengySettings:
     
     _settings = SengySettings()
     _settings.setup_environment_variables()
+    
+    # The structured summary LLM was built from the old settings
+    from .node.summarise import _structured_llm
+    _structured_llm.cache_clear()
     return _settings
 
 
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """
+    Get the process-wide LLM rate limiter (singleton pattern).
+    
+    Shared by every model returned from get_llm so that concurrent calls,
+    such as parallel map steps, stay within the configured request rate.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        from langchain_core.rate_limiters import InMemoryRateLimiter
+        settings = get_settings()
+        _rate_limiter = InMemoryRateLimiter(
+            requests_per_second=settings.rate_limit_requests_per_second,
+            check_every_n_seconds=0.1,
+            max_bucket_size=settings.rate_limit_burst_capacity,
+        )
+    return _rate_limiter
+
+
 def get_llm():
     """
     Get initialized LLM instance using current settings.
@@ -355,7 +381,7 @@ def get_llm():
     from langchain.chat_models import init_chat_model
     settings = get_settings()
     # client = wrappers.wrap_openai(openai.OpenAI())
-    return init_chat_model(settings.openai.model)
+    return init_chat_model(settings.openai.model, rate_limiter=get_rate_limiter())
 
 
 def validate_configuration(for_evaluation: bool = False) -> bool:
@@ -13,7 +13,7 @@ from langgraph.prebuilt import InjectedState
 from pydantic import BaseModel, Field
 
 from ..config import DEBUG, get_llm
-from .jira import ticket_to_document
+from .jira import tickets_to_documents
 
 
 class Analysis:
@@ -79,10 +79,7 @@ def analyze_content_tool(dimensions: List[str], memory_key: str, state: Annotate
         
         if isinstance(content, list):
             # Convert tickets to Documents using shared function
-            try: 
-                documents = [ticket_to_document(ticket) for ticket in content]
-            except:
-                documents = [Document(page_content=str(ticket)) for ticket in content]
+            documents = tickets_to_documents(content)
         else:
             documents = [Document(page_content=str(content))]
         
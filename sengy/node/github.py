@@ -1,6 +1,13 @@
+import copy
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Annotated, Dict, List, Optional, Union
+from itertools import islice
+from typing import Annotated, Callable, Dict, Iterator, List, Optional, Union
 
 from github import Auth, Github
 from github.Commit import Commit
@@ -21,24 +28,72 @@ class GitHubAPIWrapper:
     with standardized data formats for analysis.
     """
     
-    def __init__(self, token: Optional[str] = None):
+    # Commit SHAs are immutable, so commit details never go stale; PRs keep
+    # changing (reviews, merges) and are only reused for a few minutes.
+    # Both caches evict their least recently used entries past these sizes.
+    PR_CACHE_TTL = 600
+    COMMIT_CACHE_SIZE = 1024
+    PR_CACHE_SIZE = 256
+    # GitHub's maximum page size, so large limits need as few list requests as possible
+    PER_PAGE = 100
+    
+    def __init__(self, token: Optional[str] = None, max_workers: int = 8):
         """
         Initialize GitHub API wrapper.
         
         Args:
             token: GitHub personal access token. If None, will try to get from GITHUB_TOKEN env var
+            max_workers: Maximum number of GitHub requests in flight at once, across all calls
         """
         if token is None:
             token = os.environ.get("GITHUB_TOKEN")
         
         if token:
             auth = Auth.Token(token)
-            self.github = Github(auth=auth)
+            self.github = Github(auth=auth, per_page=self.PER_PAGE)
         else:
             # Use unauthenticated access (rate limited)
-            self.github = Github()
+            self.github = Github(per_page=self.PER_PAGE)
         
         self._repo_cache = {}
+        self._commit_cache = OrderedDict()
+        self._pr_cache = OrderedDict()
+        self.max_workers = max_workers
+        # Shared by every fan-out on this wrapper, so nested pools cannot
+        # multiply the number of simultaneous requests
+        self._request_slots = threading.BoundedSemaphore(max_workers)
+    
+    def _map_concurrently(self, func: Callable, items: list, bounded: bool = True) -> list:
+        """
+        Apply func to every item on a thread pool, preserving input order.
+        
+        PyGithub fetches missing attributes lazily, so converting a page of
+        commits or PRs costs one HTTP round-trip per item. Running the
+        conversions concurrently overlaps those round-trips. Each call of func
+        holds one of the wrapper's request slots unless bounded is False, which
+        is for funcs that take slots themselves.
+        """
+        if bounded:
+            func = self._bounded(func)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+    
+    def _bounded(self, func: Callable) -> Callable:
+        """Wrap func so each call holds a request slot while it runs"""
+        def call(*args, **kwargs):
+            with self._request_slots:
+                return func(*args, **kwargs)
+        return call
+    
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value, maxsize: int):
+        """Store value as the most recently used entry, evicting the oldest past maxsize"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
     
     def _get_repo(self, repo_name: str) -> Repository:
         """Get repository object with caching"""
@@ -46,6 +101,33 @@ class GitHubAPIWrapper:
             self._repo_cache[repo_name] = self.github.get_repo(repo_name)
         return self._repo_cache[repo_name]
     
+    def _list_commits(self, repo: str, since: str = None, until: str = None,
+                      author: str = None, path: str = None) -> Iterator[Commit]:
+        """Open a paginated commit listing; pages are fetched as it is consumed"""
+        repository = self._get_repo(repo)
+        
+        # Convert string dates to datetime objects
+        since_dt = datetime.fromisoformat(since.replace('Z', '+00:00')) if since else None
+        until_dt = datetime.fromisoformat(until.replace('Z', '+00:00')) if until else None
+        
+        return repository.get_commits(
+            since=since_dt,
+            until=until_dt,
+            author=author,
+            path=path
+        )
+    
+    def iter_commits(self, repo: str, since: str = None, until: str = None,
+                     author: str = None, path: str = None, limit: int = 30) -> Iterator[dict]:
+        """
+        Lazily yield commits from a GitHub repository, converting one at a time.
+        
+        Takes the same arguments as get_commits. Useful when the caller may stop
+        early or wants to stream results without holding the whole list.
+        """
+        for commit in islice(self._list_commits(repo, since, until, author, path), limit):
+            yield self._commit_to_dict(commit)
+    
     def get_commits(self, repo: str, since: str = None, until: str = None,
                    author: str = None, path: str = None, limit: int = 30) -> List[dict]:
         """
@@ -62,28 +144,62 @@ class GitHubAPIWrapper:
         Returns:
             List of commit dictionaries
         """
-        repository = self._get_repo(repo)
+        with self._request_slots:
+            commits = list(islice(self._list_commits(repo, since, until, author, path), limit))
+        return self._map_concurrently(self._commit_to_dict, commits)
+    
+    def get_commits_many(self, repos: List[str], since: str = None, until: str = None,
+                         author: str = None, path: str = None, limit: int = 30) -> Dict[str, List[dict]]:
+        """
+        Get commits from several GitHub repositories concurrently.
         
-        # Convert string dates to datetime objects
-        since_dt = datetime.fromisoformat(since.replace('Z', '+00:00')) if since else None
-        until_dt = datetime.fromisoformat(until.replace('Z', '+00:00')) if until else None
+        Repositories are fetched on a pool of at most max_workers threads. Their
+        listing and conversion requests share the wrapper's request slots, so no
+        more than max_workers requests run at once in total, keeping clear of
+        GitHub's secondary rate limits.
         
-        commits = repository.get_commits(
-            since=since_dt,
-            until=until_dt,
-            author=author,
-            path=path
+        Args:
+            repos: Repository names in format "owner/repo"
+            since: ISO 8601 date string to start from
+            until: ISO 8601 date string to end at
+            author: Filter by author GitHub username
+            path: Filter by file path
+            limit: Maximum number of commits to return per repository
+            
+        Returns:
+            Dictionary mapping each repository name to its list of commit dictionaries
+        """
+        repos = list(dict.fromkeys(repos))
+        # get_commits takes request slots itself; holding one here would deadlock its inner pool
+        results = self._map_concurrently(
+            lambda repo: self.get_commits(repo, since, until, author, path, limit), repos, bounded=False
         )
+        return dict(zip(repos, results))
+    
+    def _list_pull_requests(self, repo: str, state: str = "all", since: str = None,
+                            limit: int = 30) -> Iterator[PullRequest]:
+        """Yield PRs by most recently updated, scanning at most limit of them"""
+        repository = self._get_repo(repo)
+        
+        prs = repository.get_pulls(state=state, sort="updated", direction="desc")
+        since_dt = datetime.fromisoformat(since.replace('Z', '+00:00')) if since else None
         
-        commit_list = []
-        for i, commit in enumerate(commits):
-            if i >= limit:
-                break
-                
-            commit_data = self._commit_to_dict(commit)
-            commit_list.append(commit_data)
+        for pr in islice(prs, limit):
+            # Filter by date if specified
+            if since_dt and pr.updated_at < since_dt:
+                continue
+            
+            yield pr
+    
+    def iter_pull_requests(self, repo: str, state: str = "all",
+                           since: str = None, limit: int = 30) -> Iterator[dict]:
+        """
+        Lazily yield pull requests from a GitHub repository, converting one at a time.
         
-        return commit_list
+        Takes the same arguments as get_pull_requests.
+        """
+        for pr in self._list_pull_requests(repo, state, since, limit):
+            yield self._pr_to_dict(pr)
     
     def get_pull_requests(self, repo: str, state: str = "all", 
                          since: str = None, limit: int = 30) -> List[dict]:
@@ -99,25 +215,9 @@ class GitHubAPIWrapper:
         Returns:
             List of PR dictionaries
         """
-        repository = self._get_repo(repo)
-        
-        prs = repository.get_pulls(state=state, sort="updated", direction="desc")
-        
-        pr_list = []
-        for i, pr in enumerate(prs):
-            if i >= limit:
-                break
-                
-            # Filter by date if specified
-            if since:
-                since_dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
-                if pr.updated_at < since_dt:
-                    continue
-            
-            pr_data = self._pr_to_dict(pr)
-            pr_list.append(pr_data)
-        
-        return pr_list
+        with self._request_slots:
+            prs = list(self._list_pull_requests(repo, state, since, limit))
+        return self._map_concurrently(self._pr_to_dict, prs)
     
     def get_commit_details(self, repo: str, sha: str) -> dict:
         """
@@ -130,9 +230,17 @@ class GitHubAPIWrapper:
         Returns:
             Detailed commit dictionary
         """
-        repository = self._get_repo(repo)
-        commit = repository.get_commit(sha)
-        return self._commit_to_dict(commit, include_files=True)
+        key = (repo, sha)
+        commit_data = self._commit_cache.get(key)
+        if commit_data is None:
+            with self._request_slots:
+                commit = self._get_repo(repo).get_commit(sha)
+            commit_data = self._commit_to_dict(commit, include_files=True)
+            self._cache_put(self._commit_cache, key, commit_data, self.COMMIT_CACHE_SIZE)
+        else:
+            self._commit_cache.move_to_end(key)
+        # Callers store the result in shared_data; a copy keeps their edits out of the cache
+        return copy.deepcopy(commit_data)
     
     def get_pr_details(self, repo: str, pr_number: int) -> dict:
         """
@@ -145,44 +253,67 @@ class GitHubAPIWrapper:
         Returns:
             Detailed PR dictionary
         """
-        repository = self._get_repo(repo)
-        pr = repository.get_pull(pr_number)
-        return self._pr_to_dict(pr, include_commits=True, include_reviews=True)
+        key = (repo, pr_number)
+        cached = self._pr_cache.get(key)
+        if cached is not None:
+            expires, pr_data = cached
+            if expires > time.monotonic():
+                self._pr_cache.move_to_end(key)
+                return copy.deepcopy(pr_data)
+            del self._pr_cache[key]
+        
+        # _pr_to_dict takes request slots itself for the PR's commits and reviews
+        with self._request_slots:
+            pr = self._get_repo(repo).get_pull(pr_number)
+        pr_data = self._pr_to_dict(pr, include_commits=True, include_reviews=True)
+        self._cache_put(self._pr_cache, key, (time.monotonic() + self.PR_CACHE_TTL, pr_data), self.PR_CACHE_SIZE)
+        return copy.deepcopy(pr_data)
     
     def _commit_to_dict(self, commit: Commit, include_files: bool = False) -> dict:
-        """Convert PyGithub Commit to dictionary"""
+        """
+        Convert PyGithub Commit to dictionary.
+        
+        Fields are read from the commit's raw JSON, which PyGithub fetches at
+        most once, instead of through attribute access where every lazily
+        populated attribute can cost another REST call.
+        """
+        raw = commit.raw_data
+        git_commit = raw.get("commit") or {}
+        git_author = git_commit.get("author") or {}
+        git_committer = git_commit.get("committer") or {}
+        stats = raw.get("stats") or {}
         commit_data = {
-            "sha": commit.sha,
-            "message": commit.commit.message,
+            "sha": raw.get("sha"),
+            "message": git_commit.get("message"),
             "author": {
-                "name": commit.commit.author.name,
-                "email": commit.commit.author.email,
-                "login": commit.author.login if commit.author else None
+                "name": git_author.get("name"),
+                "email": git_author.get("email"),
+                "login": (raw.get("author") or {}).get("login")
             },
             "committer": {
-                "name": commit.commit.committer.name,
-                "email": commit.commit.committer.email,
-                "login": commit.committer.login if commit.committer else None
+                "name": git_committer.get("name"),
+                "email": git_committer.get("email"),
+                "login": (raw.get("committer") or {}).get("login")
             },
-            "date": commit.commit.author.date.isoformat(),
-            "url": commit.html_url,
+            "date": git_author.get("date"),
+            "url": raw.get("html_url"),
             "stats": {
-                "additions": commit.stats.additions,
-                "deletions": commit.stats.deletions,
-                "total": commit.stats.total
+                "additions": stats.get("additions", 0),
+                "deletions": stats.get("deletions", 0),
+                "total": stats.get("total", 0)
             }
         }
         
         if include_files:
             commit_data["files"] = []
-            for file in commit.files:
+            for file in raw.get("files") or []:
                 file_data = {
-                    "filename": file.filename,
-                    "status": file.status,
-                    "additions": file.additions,
-                    "deletions": file.deletions,
-                    "changes": file.changes,
-                    "patch": file.patch if hasattr(file, 'patch') and file.patch else None
+                    "filename": file.get("filename"),
+                    "status": file.get("status"),
+                    "additions": file.get("additions", 0),
+                    "deletions": file.get("deletions", 0),
+                    "changes": file.get("changes", 0),
+                    "patch": file.get("patch") or None
                 }
                 commit_data["files"].append(file_data)
         
@@ -190,54 +321,79 @@ class GitHubAPIWrapper:
     
     def _pr_to_dict(self, pr: PullRequest, include_commits: bool = False, 
                    include_reviews: bool = False) -> dict:
-        """Convert PyGithub PullRequest to dictionary"""
+        """
+        Convert PyGithub PullRequest to dictionary.
+        
+        Like _commit_to_dict this reads the raw JSON. The PR payload only
+        carries the author's login; name and email would need a separate
+        user lookup per PR and are left as None.
+        """
+        raw = pr.raw_data
+        user = raw.get("user") or {}
+        head = raw.get("head") or {}
+        base = raw.get("base") or {}
         pr_data = {
-            "number": pr.number,
-            "title": pr.title,
-            "body": pr.body,
-            "state": pr.state,
-            "merged": pr.merged,
+            "number": raw.get("number"),
+            "title": raw.get("title"),
+            "body": raw.get("body"),
+            "state": raw.get("state"),
+            "merged": raw.get("merged", False),
             "author": {
-                "name": pr.user.name,
-                "email": pr.user.email,
-                "login": pr.user.login
+                "name": user.get("name"),
+                "email": user.get("email"),
+                "login": user.get("login")
             },
-            "created_at": pr.created_at.isoformat(),
-            "updated_at": pr.updated_at.isoformat(),
-            "merged_at": pr.merged_at.isoformat() if pr.merged_at else None,
-            "closed_at": pr.closed_at.isoformat() if pr.closed_at else None,
-            "url": pr.html_url,
-            "head_sha": pr.head.sha,
-            "base_sha": pr.base.sha,
-            "head_ref": pr.head.ref,
-            "base_ref": pr.base.ref,
-            "changed_files": pr.changed_files,
-            "additions": pr.additions,
-            "deletions": pr.deletions,
-            "labels": [label.name for label in pr.labels],
-            "assignees": [assignee.login for assignee in pr.assignees],
-            "requested_reviewers": [reviewer.login for reviewer in pr.requested_reviewers]
+            # GitHub already sends timestamps as ISO 8601 strings; pass them through
+            "created_at": raw.get("created_at"),
+            "updated_at": raw.get("updated_at"),
+            "merged_at": raw.get("merged_at"),
+            "closed_at": raw.get("closed_at"),
+            "url": raw.get("html_url"),
+            "head_sha": head.get("sha"),
+            "base_sha": base.get("sha"),
+            "head_ref": head.get("ref"),
+            "base_ref": base.get("ref"),
+            "changed_files": raw.get("changed_files", 0),
+            "additions": raw.get("additions", 0),
+            "deletions": raw.get("deletions", 0),
+            "labels": [label["name"] for label in raw.get("labels") or []],
+            "assignees": [assignee["login"] for assignee in raw.get("assignees") or []],
+            "requested_reviewers": [reviewer["login"] for reviewer in raw.get("requested_reviewers") or []]
         }
         
-        if include_commits:
-            pr_data["commits"] = []
-            for commit in pr.get_commits():
-                commit_data = self._commit_to_dict(commit)
-                pr_data["commits"].append(commit_data)
-        
-        if include_reviews:
-            pr_data["reviews"] = []
-            for review in pr.get_reviews():
-                review_data = {
-                    "id": review.id,
-                    "user": review.user.login,
-                    "state": review.state,
-                    "body": review.body,
-                    "submitted_at": review.submitted_at.isoformat() if review.submitted_at else None
-                }
-                pr_data["reviews"].append(review_data)
+        # Fetch commits and reviews side by side rather than one after the other
+        if include_commits or include_reviews:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                commits = executor.submit(self._get_pr_commits, pr) if include_commits else None
+                reviews = executor.submit(self._get_pr_reviews, pr) if include_reviews else None
+                if commits:
+                    pr_data["commits"] = commits.result()
+                if reviews:
+                    pr_data["reviews"] = reviews.result()
         
         return pr_data
+    
+    def _get_pr_commits(self, pr: PullRequest) -> List[dict]:
+        """Fetch and convert all commits of a pull request"""
+        with self._request_slots:
+            commits = list(pr.get_commits())
+        return self._map_concurrently(self._commit_to_dict, commits)
+    
+    def _get_pr_reviews(self, pr: PullRequest) -> List[dict]:
+        """Fetch and convert all reviews of a pull request"""
+        with self._request_slots:
+            raw_reviews = [review.raw_data for review in pr.get_reviews()]
+        reviews = []
+        for raw in raw_reviews:
+            review_data = {
+                "id": raw.get("id"),
+                "user": (raw.get("user") or {}).get("login"),
+                "state": raw.get("state"),
+                "body": raw.get("body"),
+                "submitted_at": raw.get("submitted_at")
+            }
+            reviews.append(review_data)
+        return reviews
 
 
 class PowerGitHubToolkit(BaseToolkit):
@@ -249,6 +405,7 @@ class PowerGitHubToolkit(BaseToolkit):
     def get_tools(self) -> List[BaseTool]:
         return [
             self._create_get_commits_tool(),
+            self._create_get_commits_many_tool(),
             self._create_get_pull_requests_tool(),
             self._create_get_commit_details_tool(),
             self._create_get_pr_details_tool()
@@ -290,6 +447,44 @@ class PowerGitHubToolkit(BaseToolkit):
         
         return get_github_commits
     
+    def _create_get_commits_many_tool(self) -> BaseTool:
+        """Create tool for fetching commits from several repositories at once"""
+        
+        @tool(parse_docstring=True)
+        def get_github_commits_many(repos: List[str], tool_call_id: Annotated[str, InjectedToolCallId],
+                                    since: str = None, until: str = None, author: str = None,
+                                    path: str = None, limit: int = 30) -> str:
+            """
+            Fetch commits from several GitHub repositories in one call.
+            
+            The repositories are queried concurrently and all commits are stored in shared memory
+            as a single list, each commit tagged with the "repo" it came from. Prefer this over
+            repeated get_github_commits calls when comparing activity across repositories.
+            
+            Args:
+                repos: Repository names in format "owner/repo" (e.g., ["facebook/react", "vercel/next.js"])
+                since: ISO 8601 date string to start from (e.g., "2024-01-01T00:00:00Z")
+                until: ISO 8601 date string to end at
+                author: Filter commits by GitHub username
+                path: Filter commits that touch specific file path
+                limit: Maximum number of commits to return per repository (default: 30)
+            """
+            by_repo = self._api.get_commits_many(repos, since, until, author, path, limit)
+            commits = [{**commit, "repo": repo} for repo, repo_commits in by_repo.items() for commit in repo_commits]
+            
+            key = f"github.commits.{tool_call_id}"
+            return Command(
+                update={
+                    "shared_data": {key: commits},
+                    "messages": [ToolMessage(
+                        f"Retrieved {len(commits)} commits from {len(by_repo)} repositories. Memory key: {key}",
+                        tool_call_id=tool_call_id
+                    )]
+                }
+            )
+        
+        return get_github_commits_many
+    
     def _create_get_pull_requests_tool(self) -> BaseTool:
         """Create tool for fetching repository pull requests"""
         
@@ -394,35 +589,36 @@ def github_commit_to_document(commit: dict) -> Document:
     Returns:
         Document: LangChain Document with commit content and metadata
     """
-    content = f"Commit SHA: {commit.get('sha')}\n"
-    content += f"Message: {commit.get('message', 'N/A')}\n"
+    parts = [f"Commit SHA: {commit.get('sha')}\n"]
+    parts.append(f"Message: {commit.get('message', 'N/A')}\n")
     
     author = commit.get('author', {})
-    content += f"Author: {author.get('name', 'Unknown')}"
-    if author.get('login'):
-        content += f" ({author['login']})"
-    if author.get('email'):
-        content += f" <{author['email']}>"
-    content += "\n"
+    parts.append(f"Author: {author.get('name', 'Unknown')}")
+    if login := author.get('login'):
+        parts.append(f" ({login})")
+    if email := author.get('email'):
+        parts.append(f" <{email}>")
+    parts.append("\n")
     
-    content += f"Date: {commit.get('date', 'N/A')}\n"
+    parts.append(f"Date: {commit.get('date', 'N/A')}\n")
     
     stats = commit.get('stats', {})
     if stats:
-        content += f"Changes: +{stats.get('additions', 0)} -{stats.get('deletions', 0)} ({stats.get('total', 0)} total)\n"
+        parts.append(f"Changes: +{stats.get('additions', 0)} -{stats.get('deletions', 0)} ({stats.get('total', 0)} total)\n")
     
     files = commit.get('files', [])
     if files:
-        content += f"Files Changed ({len(files)}):\n"
-        for file_info in files:
-            filename = file_info.get('filename', 'unknown')
-            additions = file_info.get('additions', 0)
-            deletions = file_info.get('deletions', 0)
-            status = file_info.get('status', 'modified')
-            content += f"  - {filename} ({status}): +{additions} -{deletions}\n"
+        parts.append(f"Files Changed ({len(files)}):\n")
+        parts.extend(
+            f"  - {f.get('filename', 'unknown')} ({f.get('status', 'modified')}): "
+            f"+{f.get('additions', 0)} -{f.get('deletions', 0)}\n"
+            for f in files
+        )
+    
+    if url := commit.get('url'):
+        parts.append(f"URL: {url}\n")
     
-    if commit.get('url'):
-        content += f"URL: {commit['url']}\n"
+    content = "".join(parts)
     
     metadata = {
         'sha': commit.get('sha', 'N/A'),
@@ -446,62 +642,65 @@ def github_pr_to_document(pr: dict) -> Document:
     Returns:
         Document: LangChain Document with PR content and metadata
     """
-    content = f"Pull Request #{pr.get('number')}\n"
-    content += f"Title: {pr.get('title', 'N/A')}\n"
-    content += f"State: {pr.get('state', 'N/A')}"
+    parts = [f"Pull Request #{pr.get('number')}\n"]
+    parts.append(f"Title: {pr.get('title', 'N/A')}\n")
+    parts.append(f"State: {pr.get('state', 'N/A')}")
     if pr.get('merged'):
-        content += " (merged)"
-    content += "\n"
+        parts.append(" (merged)")
+    parts.append("\n")
     
     author = pr.get('author', {})
-    content += f"Author: {author.get('name', 'Unknown')}"
-    if author.get('login'):
-        content += f" ({author['login']})"
-    content += "\n"
+    parts.append(f"Author: {author.get('name') or 'Unknown'}")
+    if login := author.get('login'):
+        parts.append(f" ({login})")
+    parts.append("\n")
     
-    content += f"Created: {pr.get('created_at', 'N/A')}\n"
-    if pr.get('merged_at'):
-        content += f"Merged: {pr.get('merged_at')}\n"
+    parts.append(f"Created: {pr.get('created_at', 'N/A')}\n")
+    if merged_at := pr.get('merged_at'):
+        parts.append(f"Merged: {merged_at}\n")
     
-    content += f"Branches: {pr.get('head_ref', 'unknown')} → {pr.get('base_ref', 'unknown')}\n"
+    parts.append(f"Branches: {pr.get('head_ref', 'unknown')} → {pr.get('base_ref', 'unknown')}\n")
     
-    if pr.get('body'):
-        content += f"Description:\n{pr.get('body')}\n"
+    if body := pr.get('body'):
+        parts.append(f"Description:\n{body}\n")
     
-    content += f"Changes: {pr.get('changed_files', 0)} files, +{pr.get('additions', 0)} -{pr.get('deletions', 0)}\n"
+    parts.append(f"Changes: {pr.get('changed_files', 0)} files, +{pr.get('additions', 0)} -{pr.get('deletions', 0)}\n")
     
     labels = pr.get('labels', [])
     if labels:
-        content += f"Labels: {', '.join(labels)}\n"
+        parts.append(f"Labels: {', '.join(labels)}\n")
     
     assignees = pr.get('assignees', [])
     if assignees:
-        content += f"Assignees: {', '.join(assignees)}\n"
+        parts.append(f"Assignees: {', '.join(assignees)}\n")
     
     commits = pr.get('commits', [])
     if commits:
-        content += f"Commits ({len(commits)}):\n"
+        parts.append(f"Commits ({len(commits)}):\n")
         for commit in commits:
             sha = commit.get('sha', 'unknown')[:8]
-            message = commit.get('message', 'No message').split('\n')[0][:80]
-            content += f"  - {sha}: {message}\n"
+            # partition stops at the first newline instead of splitting the whole message
+            message = commit.get('message', 'No message').partition('\n')[0][:80]
+            parts.append(f"  - {sha}: {message}\n")
     
     reviews = pr.get('reviews', [])
     if reviews:
-        content += f"Reviews ({len(reviews)}):\n"
-        for review in reviews:
-            reviewer = review.get('user', 'unknown')
-            state = review.get('state', 'unknown')
-            content += f"  - {reviewer}: {state}\n"
+        parts.append(f"Reviews ({len(reviews)}):\n")
+        parts.extend(
+            f"  - {r.get('user', 'unknown')}: {r.get('state', 'unknown')}\n"
+            for r in reviews
+        )
+    
+    if url := pr.get('url'):
+        parts.append(f"URL: {url}\n")
     
-    if pr.get('url'):
-        content += f"URL: {pr['url']}\n"
+    content = "".join(parts)
     
     metadata = {
         'number': pr.get('number', 0),
         'state': pr.get('state', 'unknown'),
         'merged': pr.get('merged', False),
-        'author': author.get('login', author.get('name', 'Unknown')),
+        'author': author.get('login') or author.get('name') or 'Unknown',
         'type': 'github_pr',
         'changed_files': pr.get('changed_files', 0),
         'additions': pr.get('additions', 0),
@@ -511,6 +710,63 @@ def github_pr_to_document(pr: dict) -> Document:
     return Document(page_content=content, metadata=metadata)
 
 
+# Key sets identifying each kind of GitHub record, checked in order
+_GITHUB_DOCUMENT_CONVERTERS = (
+    (frozenset(('sha', 'message')), github_commit_to_document),
+    (frozenset(('number', 'title')), github_pr_to_document),
+)
+
+
+def _github_document_converter(item: dict):
+    """Resolve the document converter for a GitHub record, or None if unrecognised"""
+    keys = item.keys()
+    for required, converter in _GITHUB_DOCUMENT_CONVERTERS:
+        if keys >= required:
+            return converter
+    return None
+
+
+# Converted documents, least recently used first; guarded by _DOCUMENT_CACHE_LOCK
+_DOCUMENT_CACHE: "OrderedDict[tuple, Document]" = OrderedDict()
+_DOCUMENT_CACHE_LOCK = threading.Lock()
+_DOCUMENT_CACHE_SIZE = 4096
+
+
+def _github_document_key(item: dict) -> str:
+    """
+    Fingerprint a record by its full content, so any change to it (including
+    fields the converters read but no identity field reflects) misses the cache.
+    """
+    return json.dumps(item, sort_keys=True, default=repr)
+
+
+def _to_document(convert: Callable, item: dict) -> Document:
+    """
+    Convert a GitHub record via convert, memoized on _github_document_key.
+    
+    Each call gets its own deep copy of the cached Document, so callers may
+    mutate it freely.
+    """
+    try:
+        key = (convert, _github_document_key(item))
+    except TypeError:
+        # Mixed key types that cannot be sorted; convert without caching
+        return convert(item)
+
+    with _DOCUMENT_CACHE_LOCK:
+        document = _DOCUMENT_CACHE.get(key)
+        if document is not None:
+            _DOCUMENT_CACHE.move_to_end(key)
+
+    if document is None:
+        document = convert(item)
+        with _DOCUMENT_CACHE_LOCK:
+            _DOCUMENT_CACHE[key] = document
+            while len(_DOCUMENT_CACHE) > _DOCUMENT_CACHE_SIZE:
+                _DOCUMENT_CACHE.popitem(last=False)
+    return document.model_copy(deep=True)
+
+
 def github_data_to_document(data: Union[dict, List[dict]]) -> Union[Document, List[Document]]:
     """
     Convert GitHub data to Document(s) based on the data type.
@@ -522,22 +778,11 @@ def github_data_to_document(data: Union[dict, List[dict]]) -> Union[Document, Li
         Document or list of Documents
     """
     if isinstance(data, list):
-        documents = []
-        for item in data:
-            if 'sha' in item and 'message' in item:
-                # It's a commit
-                documents.append(github_commit_to_document(item))
-            elif 'number' in item and 'title' in item:
-                # It's a PR
-                documents.append(github_pr_to_document(item))
-        return documents
-    else:
-        if 'sha' in data and 'message' in data:
-            # It's a commit
-            return github_commit_to_document(data)
-        elif 'number' in data and 'title' in data:
-            # It's a PR
-            return github_pr_to_document(data)
-        else:
-            # Generic fallback
-            return Document(page_content=str(data), metadata={'type': 'github_data'})
\ No newline at end of file
+        converters = map(_github_document_converter, data)
+        return [_to_document(convert, item) for item, convert in zip(data, converters) if convert]
+    
+    convert = _github_document_converter(data)
+    if convert:
+        return _to_document(convert, data)
+    # Generic fallback
+    return Document(page_content=str(data), metadata={'type': 'github_data'})
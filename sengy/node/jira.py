@@ -1,3 +1,4 @@
+import json
 from typing import Annotated, Dict, List
 
 from langchain.docstore.document import Document
@@ -9,6 +10,29 @@ from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
 
 
+def _hours(seconds) -> str:
+    """Format a Jira duration given in seconds as hours, or 0h when it is missing or zero"""
+    return f"{seconds / 3600}h" if seconds else "0h"
+
+
+# Extra issue fields pulled from the raw "fields" payload, as (key, extractor) pairs
+_ISSUE_FIELD_EXTRACTORS = (
+    ("comments", lambda f: (f.get("comment") or {}).get("comments", [])),
+    ("labels", lambda f: f.get("labels", [])),
+    ("aggregatetimeoriginalestimate", lambda f: _hours(f.get("aggregatetimeoriginalestimate"))),
+    ("aggregatetimeestimate", lambda f: _hours(f.get("aggregatetimeestimate"))),
+    ("aggregateprogress", lambda f: _hours((f.get("aggregateprogress") or {}).get("progress"))),
+    ("progress", lambda f: _hours((f.get("progress") or {}).get("progress"))),
+    ("timeestimate", lambda f: _hours(f.get("timeestimate"))),
+    ("affects_versions", lambda f: [x.get("name") for x in f.get("versions") or []]),
+    ("components", lambda f: [x.get("name") for x in f.get("components") or []]),
+    ("flags", lambda f: [x.get("value") for x in f.get("customfield_12310250") or []]),
+    ("issue_type", lambda f: (f.get("issuetype") or {}).get("name", "")),
+    ("updated", lambda f: f.get("updated", "")),
+    ("description", lambda f: f.get("description", "")),
+)
+
+
 class MaxJiraAPIWrapper(JiraAPIWrapper):
     """A wrapper for the Jira API that is more feature rich"""
     def __init__(self, *args, **kwargs):
@@ -16,20 +40,10 @@ class MaxJiraAPIWrapper(JiraAPIWrapper):
 
     def parse_issues(self, issues: Dict) -> List[dict]:
         parsed = super().parse_issues(issues)
-        for i in range(len(issues.get('issues'))):
-            parsed[i]["comments"] = issues.get('issues')[i].get("fields", {}).get("comment", {}).get("comments", [])
-            parsed[i]["labels"] = issues.get('issues')[i].get("fields", {}).get("labels", [])
-            parsed[i]["aggregatetimeoriginalestimate"] = f"{issues.get('issues')[i].get('fields', {}).get('aggregatetimeoriginalestimate', 0) or 0 / 3600}h"
-            parsed[i]["aggregatetimeestimate"] = f"{issues.get('issues')[i].get('fields', {}).get('aggregatetimeestimate', 0) or 0/ 3600}h"
-            parsed[i]["aggregateprogress"] = f"{issues.get('issues')[i].get('fields', {}).get('aggregateprogress', {'progress': 0}).get('progress') or 0/ 3600}h"
-            parsed[i]["progress"] = f"{issues.get('issues')[i].get('fields', {}).get('progress', {'progress': 0}).get('progress') or 0 / 3600}h"
-            parsed[i]["timeestimate"] = f"{issues.get('issues')[i].get('fields', {}).get('timeestimate', 0) or 0/ 3600}h"
-            parsed[i]["affects_versions"] = [x.get("name") for x in issues.get('issues')[i].get("fields", {}).get("versions", [])] 
-            parsed[i]["components"] = [x.get("name") for x in issues.get('issues')[i].get("fields", {}).get("components", [])] 
-            parsed[i]["flags"] = [x.get("value") for x in issues.get('issues')[i].get("fields", {}).get("customfield_12310250", []) or []] 
-            parsed[i]["issue_type"] = issues.get('issues')[i].get("fields", {}).get("issuetype", {}).get("name", "")
-            parsed[i]["updated"] = issues.get('issues')[i].get("fields", {}).get("updated", "")
-            parsed[i]["description"] = issues.get('issues')[i].get("fields", {}).get("description", "")
+        for p, raw in zip(parsed, issues.get('issues') or []):
+            fields = raw.get("fields") or {}
+            for key, extract in _ISSUE_FIELD_EXTRACTORS:
+                p[key] = extract(fields)
         return parsed
     
     def search(self, query: str, start: int = None, limit: int = None, expand: bool = None) -> str:
@@ -90,18 +104,18 @@ def ticket_to_document(ticket: dict) -> Document:
     Returns:
         Document: LangChain Document with ticket content and metadata
     """
-    content = f"Key: {ticket.get('key')}\n"
-    content += f"Summary: {ticket.get('summary', 'N/A')}\n"
-    content += f"Status: {ticket.get('status', 'N/A')}\n"
-    content += f"Priority: {ticket.get('priority', 'N/A')}\n"
+    parts = [f"Key: {ticket.get('key')}\n"]
+    parts.append(f"Summary: {ticket.get('summary', 'N/A')}\n")
+    parts.append(f"Status: {ticket.get('status', 'N/A')}\n")
+    parts.append(f"Priority: {ticket.get('priority', 'N/A')}\n")
     
-    if ticket.get('description'):
-        content += f"Description: {ticket.get('description')}\n"
+    if description := ticket.get('description'):
+        parts.append(f"Description: {description}\n")
     
     # Include comments which are crucial for analysis
     comments = ticket.get('comments', [])
     if comments:
-        content += f"Comments ({len(comments)}):\n"
+        parts.append(f"Comments ({len(comments)}):\n")
         for comment in comments:
             if isinstance(comment, dict):
                 # Handle cases where author might be a string or dict
@@ -114,23 +128,25 @@ def ticket_to_document(ticket: dict) -> Document:
                     author = 'Unknown'
                     
                 body = comment.get('body', '')
-                content += f"  - {author}: {body}\n"
+                parts.append(f"  - {author}: {body}\n")
             else:
-                content += f"  - {comment}\n"
+                parts.append(f"  - {comment}\n")
     
     # Include other relevant fields from MaxJiraAPIWrapper
-    if ticket.get('labels'):
-        content += f"Labels: {', '.join(ticket.get('labels', []))}\n"
-    if ticket.get('components'):
-        content += f"Components: {', '.join(ticket.get('components', []))}\n"
-    if ticket.get('affects_versions'):
-        content += f"Affects Versions: {', '.join(ticket.get('affects_versions', []))}\n"
-    if ticket.get('flags'):
-        content += f"Flags: {', '.join(ticket.get('flags', []))}\n"
-    if ticket.get('issue_type'):
-        content += f"Issue Type: {ticket.get('issue_type')}\n"
-    if ticket.get('updated'):
-        content += f"Updated: {ticket.get('updated')}\n"
+    if labels := ticket.get('labels'):
+        parts.append(f"Labels: {', '.join(labels)}\n")
+    if components := ticket.get('components'):
+        parts.append(f"Components: {', '.join(components)}\n")
+    if affects_versions := ticket.get('affects_versions'):
+        parts.append(f"Affects Versions: {', '.join(affects_versions)}\n")
+    if flags := ticket.get('flags'):
+        parts.append(f"Flags: {', '.join(flags)}\n")
+    if issue_type := ticket.get('issue_type'):
+        parts.append(f"Issue Type: {issue_type}\n")
+    if updated := ticket.get('updated'):
+        parts.append(f"Updated: {updated}\n")
+    
+    content = "".join(parts)
     
     metadata = {
         'key': ticket.get('key', 'N/A'),
@@ -140,3 +156,25 @@ def ticket_to_document(ticket: dict) -> Document:
     }
     
     return Document(page_content=content, metadata=metadata)
+
+
+def tickets_to_documents(tickets: list) -> List[Document]:
+    """
+    Convert a list of Jira tickets to LangChain Documents.
+    
+    Items that cannot be converted with ticket_to_document fall back to their
+    JSON serialisation, without affecting the rest of the list.
+    
+    Args:
+        tickets: List of Jira ticket dicts (or other items) to convert
+        
+    Returns:
+        List[Document]: One Document per item, in the same order
+    """
+    documents = []
+    for ticket in tickets:
+        try:
+            documents.append(ticket_to_document(ticket))
+        except Exception:
+            documents.append(Document(page_content=json.dumps(ticket, default=str)))
+    return documents
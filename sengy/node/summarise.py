@@ -1,22 +1,22 @@
-import json
-from typing import Annotated, Dict
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Annotated, Callable, Dict
 
-from langchain.chains.summarize import load_summarize_chain
+import orjson
 from langchain.docstore.document import Document
 from langchain.output_parsers import PydanticOutputParser
-from langchain.prompts import PromptTemplate
-from langchain_core.messages import (  # Import MessagesState
-    AIMessage,
-    merge_message_runs,
-)
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
 from langgraph.config import get_stream_writer
 from langgraph.graph.message import MessagesState
 from langgraph.prebuilt import InjectedState
 from pydantic import BaseModel, Field
+from rich.markup import escape
 
-from ..config import DEBUG, get_llm
-from .jira import ticket_to_document
+from ..config import get_llm
+from .jira import tickets_to_documents
 
 
 class Summary:
@@ -47,23 +47,173 @@ class SummaryModel(BaseModel):
     )
 
 parser = PydanticOutputParser(pydantic_object=SummaryModel)
+_FORMAT_INSTRUCTIONS = parser.get_format_instructions()
+
+class MappedItem(BaseModel):
+    index: int = Field(description="The number of the item being analysed, as given in the input.")
+    analysis: str = Field(description="The analysis of this item across the requested dimensions.")
+
+class MappedBatch(BaseModel):
+    items: list[MappedItem] = Field(
+        description="One analysis per input item, in the order the items were given."
+    )
+
+batch_parser = PydanticOutputParser(pydantic_object=MappedBatch)
+_BATCH_FORMAT_INSTRUCTIONS = batch_parser.get_format_instructions()
+
+@lru_cache(maxsize=1)
+def _structured_llm():
+    """The LLM bound to SummaryModel output, built once and reused until reload_settings clears it"""
+    return get_llm().with_structured_output(SummaryModel)
+
+def _render_summary_prompt(dimensions: str, content: str) -> str:
+    return summary_prompt.format(dimensions=dimensions, content=content, format_instructions=_FORMAT_INSTRUCTIONS)
 
 def summarise_content(state: MessagesState) -> dict:
     dimensions = state["messages"][0].content
     content = state["messages"][-1].content
     summary = Summary(dimensions={})
-    prompt = PromptTemplate(template=summary_prompt, input_variables=["dimensions", "content"], partial_variables={"format_instructions": parser.get_format_instructions()})
     response = (
-        get_llm().with_structured_output(SummaryModel).invoke(
-            [{"role": "user", "content": prompt.format(dimensions=dimensions, content=content)}]
+        _structured_llm().invoke(
+            [{"role": "user", "content": _render_summary_prompt(dimensions, content)}]
         )        
     )
     for dimension in response.dimensions:
         summary.set_dimension(dimension.name, dimension.summary)
-    return {"messages": [AIMessage(content=json.dumps(summary.dimensions, indent=2))]}
+    return {"messages": [AIMessage(content=orjson.dumps(summary.dimensions, option=orjson.OPT_INDENT_2).decode())]}
+
+def _run_sync(coro):
+    """Run a coroutine to completion from sync code, even inside a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _map_reduce(llm, documents: list[Document], map_prompt: Callable[[str], str],
+                      batch_prompt: Callable[[str], str], reduce_prompt: Callable[[str], str],
+                      batch_size: int = 8, writer=None, token_max: int = 3000) -> str:
+    """
+    Map batches of documents concurrently, then reduce the mapped outputs in one call.
+    
+    The map calls are independent, so they are issued together and bounded only
+    by the LLM's rate limiter rather than run one after another. Each map call
+    covers up to batch_size documents; a batch whose response does not parse
+    into one analysis per document is retried one document at a time.
+    
+    If the mapped outputs together exceed token_max tokens, they are first
+    collapsed: split into groups that fit, each group reduced concurrently, and
+    repeated until the final reduce input fits.
+    
+    If a stream writer is given, progress is reported as each batch is mapped and
+    the reduce output is streamed through it chunk by chunk.
+    """
+    writer = writer or (lambda _: None)
+    
+    async def map_one(doc: Document) -> str:
+        response = await llm.ainvoke(map_prompt(doc.page_content))
+        return response.content
+    
+    async def map_batch(batch: list[Document]) -> list[str]:
+        if len(batch) == 1:
+            return [await map_one(batch[0])]
+        text = "\n\n".join(f"Item {i}:\n{doc.page_content}" for i, doc in enumerate(batch, 1))
+        response = await llm.ainvoke(batch_prompt(text))
+        try:
+            analyses = {item.index: item.analysis for item in batch_parser.parse(response.content).items}
+        except OutputParserException:
+            analyses = {}
+        if all(i in analyses for i in range(1, len(batch) + 1)):
+            return [analyses[i] for i in range(1, len(batch) + 1)]
+        return await asyncio.gather(*(map_one(doc) for doc in batch))
+    
+    async def map_indexed(index: int, batch: list[Document]) -> tuple[int, list[str]]:
+        return index, await map_batch(batch)
+    
+    # Identical documents are mapped once and their analysis fanned back out to every copy
+    unique: dict[str, int] = {}
+    unique_documents, positions = [], []
+    for doc in documents:
+        if doc.page_content not in unique:
+            unique[doc.page_content] = len(unique_documents)
+            unique_documents.append(doc)
+        positions.append(unique[doc.page_content])
+    
+    batch_size = max(batch_size, 1)
+    batches = [unique_documents[i:i + batch_size] for i in range(0, len(unique_documents), batch_size)]
+    results = [None] * len(batches)
+    done = 0
+    # Tasks are created in order so the batches are dispatched in document order
+    tasks = [asyncio.create_task(map_indexed(i, b)) for i, b in enumerate(batches)]
+    for next_mapped in asyncio.as_completed(tasks):
+        index, analyses = await next_mapped
+        results[index] = analyses
+        done += len(analyses)
+        writer({"custom_data": f"[dim]mapped {done}/{len(unique_documents)}: {escape(analyses[-1][:80])}[/dim]"})
+    unique_mapped = [analysis for batch in results for analysis in batch]
+    mapped = [unique_mapped[position] for position in positions]
+    
+    while len(mapped) > 1 and llm.get_num_tokens("\n\n".join(mapped)) > token_max:
+        groups, group_tokens = [[]], 0
+        for analysis in mapped:
+            tokens = llm.get_num_tokens(analysis)
+            if groups[-1] and group_tokens + tokens > token_max:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(analysis)
+            group_tokens += tokens
+        if len(groups) == len(mapped):
+            # Every analysis fills a group on its own; collapsing cannot shrink the input
+            break
+        writer({"custom_data": f"[dim]collapsing {len(mapped)} analyses into {len(groups)}[/dim]"})
+        responses = await asyncio.gather(*(llm.ainvoke(reduce_prompt("\n\n".join(group))) for group in groups))
+        mapped = [response.content for response in responses]
+    
+    chunks = []
+    async for chunk in llm.astream(reduce_prompt("\n\n".join(mapped))):
+        chunks.append(chunk.content)
+        writer({"custom_stream": chunk.content})
+    return "".join(chunks)
+
+@lru_cache(maxsize=128)
+def _map_reduce_prompts(dimensions: str) -> tuple[Callable[[str], str], Callable[[str], str], Callable[[str], str]]:
+    """Build the map, batch and reduce prompt renderers for a set of dimensions, reusing them for repeat requests"""
+    # Instructions and dimensions come first and the per-call text strictly last, so every
+    # map call shares a byte-identical prefix that the provider can serve from its prompt cache
+    preamble = (
+        f"You are analysing content items against these dimensions: {dimensions}\n\n"
+        "Work through every dimension in turn. For each one, identify the insights, key points, "
+        "recurring themes, risks and notable details that the content reveals about it. "
+        "Stay grounded in the content given: do not speculate beyond it, and say so plainly "
+        "when the content has nothing relevant to a dimension.\n\n"
+    )
+    
+    map_prefix = preamble + (
+        "Provide a structured analysis of the following item covering each dimension.\n\n"
+        "Content:\n"
+    )
+    
+    batch_prefix = preamble + (
+        "Provide a structured analysis of each of the numbered items below covering each dimension.\n\n"
+        f"{_BATCH_FORMAT_INSTRUCTIONS}\n\n"
+        "Content items:\n"
+    )
+    
+    reduce_prefix = preamble + (
+        "Below are analyses of individual content items. Combine them into a final dimensional summary that:\n"
+        "1. Synthesizes insights across all items for each dimension\n"
+        "2. Identifies patterns and trends\n"
+        "3. Provides aggregate insights\n\n"
+        "Individual Item Analyses:\n"
+    )
+    
+    # The text is only ever appended, so rendering is plain concatenation with no template parsing
+    return tuple((lambda text, prefix=prefix: f"{prefix}{text}\n") for prefix in (map_prefix, batch_prefix, reduce_prefix))
 
 @tool
-def summarise_content_tool(dimensions: str, content: str = None, memory_key: str = None, state: Annotated[Dict, InjectedState] = None) -> dict:
+def summarise_content_tool(dimensions: str, content: str = None, memory_key: str = None, batch_size: int = 8, state: Annotated[Dict, InjectedState] = None) -> dict:
     """
     Summarize content based on specified dimensions using map-reduce approach.
     
@@ -77,6 +227,7 @@ def summarise_content_tool(dimensions: str, content: str = None, memory_key: str
         dimensions: Comma-separated list of dimensions to summarize
         content: Optional parameter that provides plain text content to summarize
         memory_key: Optional parameter that provides Memory Key in shared memory to retrieve content from
+        batch_size: Number of items analysed together in each map step (default 8)
         state: Injected LangGraph state containing shared data
         
     Returns:
@@ -95,53 +246,13 @@ def summarise_content_tool(dimensions: str, content: str = None, memory_key: str
     if content and isinstance(content, list) and len(content) > 0:
         writer({"custom_data": f"[bold green]MAP-REDUCE SUMMARY[/bold green]: Processing {len(content)} items"})
         
-        try: 
-            documents = [ticket_to_document(ticket) for ticket in content]
-        except:
-            documents = [Document(page_content=str(ticket)) for ticket in content]
-        
-        # Create custom prompts for dimensional analysis
-        map_template = f"""
-        Analyze the following content across these dimensions: {dimensions}
-        
-        For each dimension, provide insights and key points from this item.
-        
-        Content:
-        {{text}}
-        
-        Provide a structured analysis covering each dimension.
-        """
-        
-        reduce_template = f"""
-        Below are analyses of individual content items across these dimensions: {dimensions}
-        
-        Combine these analyses into a comprehensive summary that:
-        1. Synthesizes insights across all items for each dimension
-        2. Identifies patterns and trends
-        3. Provides aggregate insights
-        
-        Individual Item Analyses:
-        {{text}}
-        
-        Create a final dimensional summary.
-        """
-        
-        # Create the map-reduce chain
-        map_prompt = PromptTemplate(template=map_template, input_variables=["text"])
-        reduce_prompt = PromptTemplate(template=reduce_template, input_variables=["text"])
+        documents = tickets_to_documents(content)
         
-        chain = load_summarize_chain(
-            llm=get_llm(),
-            chain_type="map_reduce",
-            map_prompt=map_prompt,
-            combine_prompt=reduce_prompt,
-            verbose=DEBUG
-        )
+        map_prompt, batch_prompt, reduce_prompt = _map_reduce_prompts(dimensions)
         
         writer({"custom_data": f"[blue]Running map-reduce across {len(documents)} documents[/blue]"})
         
-        # Run the chain
-        result = chain.invoke(documents)['output_text']
+        result = _run_sync(_map_reduce(get_llm(), documents, map_prompt, batch_prompt, reduce_prompt, batch_size, writer))
         
         writer({"custom_data": f"[bold green]MAP-REDUCE COMPLETE[/bold green]"})
         return {"messages": [AIMessage(content=result)]}
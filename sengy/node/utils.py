@@ -1,4 +1,6 @@
-from datetime import datetime
+from calendar import isleap
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import List
 
 from dateutil.relativedelta import relativedelta
@@ -23,64 +25,62 @@ class DateTimeToolkit(BaseToolkit):
 @tool
 def get_todays_date() -> str:
     """Returns today's date in YYYY-MM-DD format in the location of the user."""
-    from datetime import datetime
-    return datetime.now().strftime("%Y-%m-%d")
+    return date.today().isoformat()
 
 @tool
 def get_todays_datetime() -> str:
     """Returns today's date and time in YYYY-MM-DD HH:MM:SS format in the location of the user."""
-    from datetime import datetime
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
 
 @tool
 def get_current_time() -> str:
     """Returns the current time in HH:MM:SS format in the location of the user."""
-    from datetime import datetime
-    return datetime.now().strftime("%H:%M:%S")
+    return datetime.now().time().isoformat(timespec="seconds")
 
 @tool
 def is_leap_year(year: int) -> bool:
     """Checks if the given year is a leap year."""
-    if (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0):
-        return True
-    return False
+    return isleap(year)
+
+@lru_cache(maxsize=1024)
+def _parse_date(value: str) -> date:
+    """Parse a YYYY-MM-DD string, caching the dates the agent keeps asking about"""
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+# Unit handlers for delta and add_delta, keyed by unit name
+_DELTA = {
+    "days": lambda start, end: str(end.toordinal() - start.toordinal()),
+    "weeks": lambda start, end: str((end.toordinal() - start.toordinal()) // 7),
+    "months": lambda start, end: f"{(d := relativedelta(end, start)).years * 12 + d.months} months",
+    "years": lambda start, end: f"{relativedelta(end, start).years} years",
+}
+
+_ADD_DELTA = {
+    "days": lambda start, delta: start + timedelta(days=delta),
+    "weeks": lambda start, delta: start + timedelta(weeks=delta),
+    "months": lambda start, delta: start + relativedelta(months=delta),
+    "years": lambda start, delta: start + relativedelta(years=delta),
+}
+
+_INVALID_UNIT = "Invalid unit. Use 'days', 'weeks', 'months', or 'years'."
 
 @tool
 def delta(start_date: str, end_date: str, unit: str) -> str:
     """Calculates the difference between two dates in the specified unit (days, weeks, months, years)."""
     
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    start = _parse_date(start_date)
+    end = _parse_date(end_date)
     
-    if unit == "days":
-        return str((end - start).days)
-    elif unit == "weeks":
-        return str((end - start).days // 7)
-    elif unit == "months":
-        delta = relativedelta(end, start)
-        return f"{delta.years * 12 + delta.months} months"
-    elif unit == "years":
-        delta = relativedelta(end, start)
-        return f"{delta.years} years"
-    else:
-        raise ValueError("Invalid unit. Use 'days', 'weeks', 'months', or 'years'.")
+    if (compute := _DELTA.get(unit)) is None:
+        raise ValueError(_INVALID_UNIT)
+    return compute(start, end)
     
 @tool
 def add_delta(start_date: str, delta: int, unit: str) -> str:
     """Adds a delta to a date in the specified unit (days, weeks, months, years)."""
     
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    
-    if unit == "days":
-        new_date = start + relativedelta(days=delta)
-    elif unit == "weeks":
-        new_date = start + relativedelta(weeks=delta)
-    elif unit == "months":
-        new_date = start + relativedelta(months=delta)
-    elif unit == "years":
-        new_date = start + relativedelta(years=delta)
-    else:
-        raise ValueError("Invalid unit. Use 'days', 'weeks', 'months', or 'years'.")
-    
-    return new_date.strftime("%Y-%m-%d")
+    start = _parse_date(start_date)
     
+    if (add := _ADD_DELTA.get(unit)) is None:
+        raise ValueError(_INVALID_UNIT)
+    return add(start, delta).isoformat()
@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the test suite.
+"""
+from typing import List
+
+import pytest
+from langchain_community.chat_models.fake import FakeListChatModel
+from langchain_community.llms.fake import FakeListLLM
+
+from .test_utils import (
+    _DEFAULT_RESPONSES,
+    MockStreamWriter,
+    create_fake_chat_model,
+    create_fake_llm,
+    create_mock_stream_writer,
+)
+
+
+@pytest.fixture(scope="module")
+def _module_fake_llm() -> FakeListLLM:
+    """Fake LLM with the default responses, built once per module."""
+    return create_fake_llm()
+
+
+@pytest.fixture
+def fake_llm(_module_fake_llm) -> FakeListLLM:
+    """The module's fake LLM, rewound to its first response for each test."""
+    _module_fake_llm.i = 0
+    return _module_fake_llm
+
+
+@pytest.fixture(scope="module")
+def _module_fake_chat_model() -> FakeListChatModel:
+    """Fake chat model with the default responses, built once per module."""
+    return create_fake_chat_model()
+
+
+@pytest.fixture
+def fake_chat_model(_module_fake_chat_model) -> FakeListChatModel:
+    """The module's fake chat model, rewound to its first response for each test."""
+    _module_fake_chat_model.i = 0
+    return _module_fake_chat_model
+
+
+@pytest.fixture(scope="module")
+def _module_stream_writer() -> MockStreamWriter:
+    """Build the stream writer once per module; tests get it through mock_stream_writer."""
+    return create_mock_stream_writer()
+
+
+@pytest.fixture
+def mock_stream_writer(_module_stream_writer) -> MockStreamWriter:
+    """The module's stream writer, reset to its earlier messages after each test."""
+    mark = _module_stream_writer.mark()
+    yield _module_stream_writer
+    _module_stream_writer.reset_to(mark)
+
+
+def _cached_factory(create):
+    """
+    Wrap a fake-model factory so each distinct responses tuple is built only
+    once; every hand-out is rewound to its first response.
+    """
+    cache = {}
+    
+    def make(responses: List[str] = None):
+        key = tuple(responses) if responses else _DEFAULT_RESPONSES
+        if key not in cache:
+            cache[key] = create(list(key))
+        model = cache[key]
+        model.i = 0
+        return model
+    return make
+
+
+@pytest.fixture(scope="session")
+def fake_llm_factory():
+    """Return fake LLMs for given responses, shared across the session."""
+    return _cached_factory(create_fake_llm)
+
+
+@pytest.fixture(scope="session")
+def fake_chat_model_factory():
+    """Return fake chat models for given responses, shared across the session."""
+    return _cached_factory(create_fake_chat_model)
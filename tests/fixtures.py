@@ -1,6 +1,7 @@
 """
 Test fixtures for Jira ticket testing.
 """
+from itertools import cycle
 from typing import Dict, List
 
 import pytest
@@ -56,42 +57,49 @@ def sample_ticket():
     return create_sample_ticket()
 
 
-@pytest.fixture
+# Immutable fields shared by every ticket in the large dataset; list fields are built per ticket
+_LARGE_TICKET_BASE = {
+    "updated": "2024-01-01T12:00:00.000Z",
+}
+
+
+@pytest.fixture(scope="session")
 def large_ticket_dataset():
-    """Create a larger dataset of tickets for batch testing."""
-    tickets = []
-    
+    """Create a larger dataset of tickets for batch testing. Shared by the session; do not mutate."""
     # Create diverse tickets
-    ticket_types = ["Bug", "Feature", "Task", "Story"]
-    priorities = ["Low", "Medium", "High", "Critical"]
-    statuses = ["Open", "In Progress", "Review", "Done"]
+    ticket_types = cycle(["Bug", "Feature", "Task", "Story"])
+    priorities = cycle(["Low", "Medium", "High", "Critical"])
+    statuses = cycle(["Open", "In Progress", "Review", "Done"])
     
-    for i in range(25):  # Create 25 tickets for testing batch processing
-        ticket = create_sample_ticket(
-            key=f"TEST-{1000 + i}",
-            summary=f"Sample ticket {i + 1}",
-            status=statuses[i % len(statuses)],
-            priority=priorities[i % len(priorities)],
-            issue_type=ticket_types[i % len(ticket_types)],
-            description=f"This is a detailed description for ticket {i + 1}. " * 3,
-            comments=[
+    # Create 25 tickets for testing batch processing
+    return [
+        {
+            **_LARGE_TICKET_BASE,
+            "key": f"TEST-{1000 + i}",
+            "summary": f"Sample ticket {i + 1}",
+            "status": status,
+            "priority": priority,
+            "description": f"This is a detailed description for ticket {i + 1}. " * 3,
+            "comments": [
                 {
                     "author": {"displayName": f"User {j}"},
                     "body": f"Comment {j} on ticket {i + 1}"
                 }
                 for j in range((i % 3) + 1)  # Variable number of comments
             ],
-            labels=[f"label-{i}", "common-label"],
-            components=[f"Component-{i % 5}"]
-        )
-        tickets.append(ticket)
-    
-    return tickets
+            "labels": [f"label-{i}", "common-label"],
+            "components": [f"Component-{i % 5}"],
+            "affects_versions": ["1.0.0"],
+            "flags": [],
+            "issue_type": issue_type,
+        }
+        for i, status, priority, issue_type in zip(range(25), statuses, priorities, ticket_types)
+    ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def small_ticket_dataset():
-    """Small dataset for basic testing."""
+    """Small dataset for basic testing. Shared by the session; do not mutate."""
     return [
         create_sample_ticket(
             key="SMALL-1",
@@ -0,0 +1,73 @@
+"""
+Unit tests for the date and time toolkit.
+"""
+import re
+
+import pytest
+
+from sengy.node.utils import (
+    add_delta,
+    delta,
+    get_current_time,
+    get_todays_date,
+    get_todays_datetime,
+    is_leap_year,
+)
+
+
+class TestCurrentDateTime:
+    """Test the current date and time tools."""
+
+    def test_formats(self):
+        """Test that each tool returns its documented format."""
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2}", get_todays_date.invoke({}))
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", get_todays_datetime.invoke({}))
+        assert re.fullmatch(r"\d{2}:\d{2}:\d{2}", get_current_time.invoke({}))
+
+
+class TestIsLeapYear:
+    """Test the is_leap_year tool."""
+
+    @pytest.mark.parametrize("year,expected", [(2024, True), (2023, False), (1900, False), (2000, True)])
+    def test_is_leap_year(self, year, expected):
+        """Test the Gregorian leap year rules."""
+        assert is_leap_year.invoke({"year": year}) is expected
+
+
+class TestDelta:
+    """Test the delta tool."""
+
+    def test_days_and_weeks(self):
+        """Test day and week differences, including across a leap day."""
+        assert delta.invoke({"start_date": "2024-02-01", "end_date": "2024-03-15", "unit": "days"}) == "43"
+        assert delta.invoke({"start_date": "2024-02-01", "end_date": "2024-03-15", "unit": "weeks"}) == "6"
+        assert delta.invoke({"start_date": "2024-03-15", "end_date": "2024-02-01", "unit": "days"}) == "-43"
+
+    def test_months_and_years(self):
+        """Test calendar-aware month and year differences."""
+        assert delta.invoke({"start_date": "2023-01-31", "end_date": "2024-03-01", "unit": "months"}) == "13 months"
+        assert delta.invoke({"start_date": "2020-02-29", "end_date": "2024-02-28", "unit": "years"}) == "3 years"
+
+    def test_invalid_unit(self):
+        """Test that an unknown unit is rejected."""
+        with pytest.raises(ValueError):
+            delta.func("2024-01-01", "2024-01-02", "fortnights")
+
+
+class TestAddDelta:
+    """Test the add_delta tool."""
+
+    def test_days_and_weeks(self):
+        """Test adding days and weeks."""
+        assert add_delta.invoke({"start_date": "2024-02-28", "delta": 2, "unit": "days"}) == "2024-03-01"
+        assert add_delta.invoke({"start_date": "2024-01-01", "delta": -1, "unit": "weeks"}) == "2023-12-25"
+
+    def test_months_and_years(self):
+        """Test adding months and years clamps to the end of the month."""
+        assert add_delta.invoke({"start_date": "2024-01-31", "delta": 1, "unit": "months"}) == "2024-02-29"
+        assert add_delta.invoke({"start_date": "2024-02-29", "delta": 1, "unit": "years"}) == "2025-02-28"
+
+    def test_invalid_unit(self):
+        """Test that an unknown unit is rejected."""
+        with pytest.raises(ValueError):
+            add_delta.func("2024-01-01", 1, "fortnights")
@@ -1,21 +1,119 @@
 """
 Unit tests for GitHub API wrapper and related functionality.
 """
-import pytest
+import copy
+import threading
 from datetime import datetime
-from unittest.mock import Mock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
-from sengy.node.github import GitHubAPIWrapper
+import pytest
 from github import Github
 from github.Commit import Commit
 from github.PullRequest import PullRequest
 from github.Repository import Repository
 
+from sengy.node.github import GitHubAPIWrapper
+
+# Raw API payloads shared by the commit and pull request mocks
+COMMIT_BASE_ATTRS = {
+    "sha": "abc123",
+    "commit": {
+        "message": "Test commit",
+        "author": {"name": "Test Author", "email": "test@example.com", "date": "2024-01-15T10:30:00Z"},
+        "committer": {"name": "Test Committer", "email": "committer@example.com"}
+    },
+    "author": {"login": "testuser"},
+    "committer": {"login": "testcommitter"},
+    "html_url": "https://github.com/owner/repo/commit/abc123",
+    "stats": {"additions": 10, "deletions": 5, "total": 15}
+}
+
+PR_BASE_ATTRS = {
+    "number": 42,
+    "title": "Test PR",
+    "body": "Test description",
+    "state": "open",
+    "merged": False,
+    "created_at": "2024-01-15T09:00:00Z",
+    "updated_at": "2024-01-16T15:30:00Z",
+    "merged_at": None,
+    "closed_at": None,
+    "user": {"login": "testuser"},
+    "html_url": "https://github.com/owner/repo/pull/42",
+    "head": {"sha": "def456", "ref": "feature"},
+    "base": {"sha": "abc123", "ref": "main"},
+    "changed_files": 3,
+    "additions": 50,
+    "deletions": 10,
+    "labels": [{"name": "bug"}, {"name": "urgent"}],
+    "assignees": [{"login": "assignee1"}],
+    "requested_reviewers": [{"login": "reviewer1"}]
+}
+
+COMMIT_FILE = {
+    "filename": "src/test.py",
+    "status": "modified",
+    "additions": 50,
+    "deletions": 10,
+    "changes": 60,
+    "patch": "@@ -1,3 +1,3 @@\n test"
+}
+
+
+COMMIT_EXPECTED = {
+    "sha": "abc123",
+    "message": "Test commit",
+    "author": {"name": "Test Author", "email": "test@example.com", "login": "testuser"},
+    "committer": {"name": "Test Committer", "email": "committer@example.com", "login": "testcommitter"},
+    "stats": {"additions": 10, "deletions": 5, "total": 15},
+}
+
+PR_EXPECTED = {
+    "number": 42,
+    "title": "Test PR",
+    "state": "open",
+    "merged": False,
+    "author": {"name": None, "email": None, "login": "testuser"},
+    "head_ref": "feature",
+    "base_ref": "main",
+    "changed_files": 3,
+    "additions": 50,
+    "deletions": 10,
+    "labels": ["bug", "urgent"],
+    "assignees": ["assignee1"],
+    "requested_reviewers": ["reviewer1"],
+}
+
+# PR update times either side of the since filter used in the PR listing tests
+RECENT_UPDATE = datetime.fromisoformat("2024-01-20T00:00:00+00:00")
+STALE_UPDATE = datetime.fromisoformat("2023-12-20T00:00:00+00:00")
+
+
+def build_mock(spec: type, raw_data: dict = None, overrides: dict = None) -> Mock:
+    """Build a fresh spec'd mock with its own copy of raw_data and top-level overrides."""
+    mock = Mock(spec=spec)
+    if raw_data is not None:
+        mock.raw_data = copy.deepcopy({**raw_data, **(overrides or {})})
+    return mock
+
+
+@pytest.fixture
+def mock_commit():
+    """A commit mock with the base raw data, safe to modify."""
+    return build_mock(Commit, COMMIT_BASE_ATTRS)
+
+
+@pytest.fixture
+def mock_pr():
+    """A pull request mock with the base raw data, safe to modify."""
+    return build_mock(PullRequest, PR_BASE_ATTRS)
+
 
 class TestGitHubAPIWrapper:
     """Test the GitHubAPIWrapper class."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_github(self):
         """Create a mock GitHub instance."""
         return Mock(spec=Github)
@@ -23,38 +121,48 @@ class TestGitHubAPIWrapper:
     @pytest.fixture
     def mock_repo(self):
         """Create a mock repository."""
-        return Mock(spec=Repository)
+        return build_mock(Repository)
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def api_wrapper(self, mock_github):
         """Create GitHubAPIWrapper with mocked GitHub."""
         with patch('sengy.node.github.Github', return_value=mock_github):
             wrapper = GitHubAPIWrapper(token="test_token")
         return wrapper
     
-    def test_init_with_token(self):
+    @pytest.fixture(autouse=True)
+    def reset_shared_state(self, api_wrapper, mock_github):
+        """Reset the module-scoped mock and wrapper caches after each test."""
+        yield
+        mock_github.reset_mock(return_value=True, side_effect=True)
+        api_wrapper.github = mock_github
+        api_wrapper._repo_cache.clear()
+        api_wrapper._commit_cache.clear()
+        api_wrapper._pr_cache.clear()
+    
+    @patch('sengy.node.github.Auth.Token')
+    @patch('sengy.node.github.Github')
+    def test_init_with_token(self, mock_github_class, mock_auth):
         """Test initialization with token."""
-        with patch('sengy.node.github.Github') as mock_github_class:
-            with patch('sengy.node.github.Auth.Token') as mock_auth:
-                wrapper = GitHubAPIWrapper(token="test_token")
-                mock_auth.assert_called_once_with("test_token")
-                mock_github_class.assert_called_once()
+        wrapper = GitHubAPIWrapper(token="test_token")
+        mock_auth.assert_called_once_with("test_token")
+        mock_github_class.assert_called_once()
     
-    def test_init_without_token(self):
+    @patch.dict('os.environ', {}, clear=True)
+    @patch('sengy.node.github.Github')
+    def test_init_without_token(self, mock_github_class):
         """Test initialization without token (unauthenticated)."""
-        with patch('sengy.node.github.Github') as mock_github_class:
-            with patch.dict('os.environ', {}, clear=True):
-                wrapper = GitHubAPIWrapper()
-                # Should create unauthenticated Github instance
-                mock_github_class.assert_called_once_with()
+        wrapper = GitHubAPIWrapper()
+        # Should create unauthenticated Github instance
+        mock_github_class.assert_called_once_with(per_page=100)
     
-    def test_init_with_env_token(self):
+    @patch.dict('os.environ', {'GITHUB_TOKEN': 'env_token'})
+    @patch('sengy.node.github.Auth.Token')
+    @patch('sengy.node.github.Github')
+    def test_init_with_env_token(self, mock_github_class, mock_auth):
         """Test initialization with token from environment."""
-        with patch('sengy.node.github.Github') as mock_github_class:
-            with patch('sengy.node.github.Auth.Token') as mock_auth:
-                with patch.dict('os.environ', {'GITHUB_TOKEN': 'env_token'}):
-                    wrapper = GitHubAPIWrapper()
-                    mock_auth.assert_called_once_with("env_token")
+        wrapper = GitHubAPIWrapper()
+        mock_auth.assert_called_once_with("env_token")
     
     def test_get_repo_caching(self, api_wrapper, mock_github):
         """Test repository caching functionality."""
@@ -72,43 +180,33 @@ class TestGitHubAPIWrapper:
         assert mock_github.get_repo.call_count == 1
         assert repo1 is repo2
     
-    def test_get_commits_basic(self, api_wrapper, mock_github, mock_repo):
-        """Test basic commit retrieval."""
-        # Setup mock commit
-        mock_commit = Mock(spec=Commit)
-        mock_commit.sha = "abc123"
-        mock_commit.commit.message = "Test commit"
-        mock_commit.commit.author.name = "Test Author"
-        mock_commit.commit.author.email = "test@example.com"
-        mock_commit.commit.author.date = datetime(2024, 1, 15, 10, 30)
-        mock_commit.commit.committer.name = "Test Committer"
-        mock_commit.commit.committer.email = "committer@example.com"
-        mock_commit.author.login = "testuser"
-        mock_commit.committer.login = "testcommitter"
-        mock_commit.html_url = "https://github.com/owner/repo/commit/abc123"
-        mock_commit.stats.additions = 10
-        mock_commit.stats.deletions = 5
-        mock_commit.stats.total = 15
-        
-        mock_repo.get_commits.return_value = [mock_commit]
+    def test_get_commits_concurrent_preserves_order(self, api_wrapper, mock_github, mock_repo):
+        """Test that concurrent commit conversion keeps the API order and limit."""
+        mock_repo.get_commits.return_value = [SimpleNamespace(sha=f"sha{i}") for i in range(5)]
         mock_github.get_repo.return_value = mock_repo
         api_wrapper.github = mock_github
-        
-        commits = api_wrapper.get_commits("owner/repo", limit=1)
-        
-        assert len(commits) == 1
-        commit_data = commits[0]
-        assert commit_data["sha"] == "abc123"
-        assert commit_data["message"] == "Test commit"
-        assert commit_data["author"]["name"] == "Test Author"
-        assert commit_data["author"]["email"] == "test@example.com"
-        assert commit_data["author"]["login"] == "testuser"
-        assert commit_data["stats"]["additions"] == 10
-        assert commit_data["stats"]["deletions"] == 5
-        assert commit_data["stats"]["total"] == 15
-    
-    def test_get_commits_with_filters(self, api_wrapper, mock_github, mock_repo):
+
+        with patch.object(api_wrapper, '_commit_to_dict', side_effect=lambda c: {"sha": c.sha}):
+            commits = api_wrapper.get_commits("owner/repo", limit=3)
+
+        assert [c["sha"] for c in commits] == ["sha0", "sha1", "sha2"]
+
+    def test_iter_commits_is_lazy(self, api_wrapper, mock_github, mock_repo):
+        """Test that iter_commits only converts the commits that are consumed."""
+        mock_repo.get_commits.return_value = [SimpleNamespace(sha=f"sha{i}") for i in range(5)]
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_commit_to_dict', side_effect=lambda c: {"sha": c.sha}) as convert:
+            commits = api_wrapper.iter_commits("owner/repo", limit=5)
+            assert convert.call_count == 0
+            assert next(commits)["sha"] == "sha0"
+            assert convert.call_count == 1
+
+    def test_get_commits_with_filters(self, api_wrapper, mock_github, mock_repo, monkeypatch):
         """Test commit retrieval with date and author filters."""
+        # Only the query is under test, so skip converting whatever comes back
+        monkeypatch.setattr(api_wrapper, "_commit_to_dict", lambda commit: None)
         mock_repo.get_commits.return_value = []
         mock_github.get_repo.return_value = mock_repo
         api_wrapper.github = mock_github
@@ -131,146 +229,174 @@ class TestGitHubAPIWrapper:
         assert call_args["since"] is not None
         assert call_args["until"] is not None
     
-    def test_get_pull_requests_basic(self, api_wrapper, mock_github, mock_repo):
-        """Test basic pull request retrieval."""
-        # Setup mock PR
-        mock_pr = Mock(spec=PullRequest)
-        mock_pr.number = 42
-        mock_pr.title = "Test PR"
-        mock_pr.body = "Test description"
-        mock_pr.state = "open"
-        mock_pr.merged = False
-        mock_pr.user.name = "Test User"
-        mock_pr.user.email = "test@example.com"
-        mock_pr.user.login = "testuser"
-        mock_pr.created_at = datetime(2024, 1, 15, 9, 0)
-        mock_pr.updated_at = datetime(2024, 1, 16, 15, 30)
-        mock_pr.merged_at = None
-        mock_pr.closed_at = None
-        mock_pr.html_url = "https://github.com/owner/repo/pull/42"
-        mock_pr.head.sha = "def456"
-        mock_pr.base.sha = "abc123"
-        mock_pr.head.ref = "feature-branch"
-        mock_pr.base.ref = "main"
-        mock_pr.changed_files = 3
-        mock_pr.additions = 50
-        mock_pr.deletions = 10
-        mock_pr.labels = []
-        mock_pr.assignees = []
-        mock_pr.requested_reviewers = []
+    def test_get_commits_many(self, api_wrapper):
+        """Test fetching commits from several repositories at once."""
+        with patch.object(api_wrapper, 'get_commits', side_effect=lambda repo, *args: [{"sha": repo}]) as get_commits:
+            results = api_wrapper.get_commits_many(["owner/a", "owner/b", "owner/a"], limit=5)
+
+        assert results == {"owner/a": [{"sha": "owner/a"}], "owner/b": [{"sha": "owner/b"}]}
+        get_commits.assert_any_call("owner/a", None, None, None, None, 5)
+        assert get_commits.call_count == 2
+
+    def test_get_commits_many_caps_concurrent_requests(self, mock_github, monkeypatch):
+        """Test that repo listings and commit conversions together stay within max_workers requests."""
+        with patch('sengy.node.github.Github', return_value=mock_github):
+            wrapper = GitHubAPIWrapper(token="test_token", max_workers=2)
         
-        mock_repo.get_pulls.return_value = [mock_pr]
-        mock_github.get_repo.return_value = mock_repo
-        api_wrapper.github = mock_github
+        lock = threading.Lock()
+        in_flight = peak = started = 0
+        # The first two requests (two repo listings) only get past this together
+        overlap = threading.Barrier(2, timeout=5)
         
-        prs = api_wrapper.get_pull_requests("owner/repo", limit=1)
+        def request():
+            nonlocal in_flight, peak, started
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                started += 1
+                first_pair = started <= 2
+            if first_pair:
+                overlap.wait()
+            with lock:
+                in_flight -= 1
         
-        assert len(prs) == 1
-        pr_data = prs[0]
-        assert pr_data["number"] == 42
-        assert pr_data["title"] == "Test PR"
-        assert pr_data["state"] == "open"
-        assert pr_data["merged"] == False
-        assert pr_data["author"]["login"] == "testuser"
-        assert pr_data["changed_files"] == 3
-        assert pr_data["additions"] == 50
-        assert pr_data["deletions"] == 10
-    
-    def test_get_commit_details(self, api_wrapper, mock_github, mock_repo):
-        """Test detailed commit retrieval."""
-        # Setup mock commit with file details
-        mock_commit = Mock(spec=Commit)
-        mock_commit.sha = "abc123"
-        mock_commit.commit.message = "Detailed commit"
-        mock_commit.commit.author.name = "Test Author"
-        mock_commit.commit.author.email = "test@example.com"
-        mock_commit.commit.author.date = datetime(2024, 1, 15, 12, 0)
-        mock_commit.commit.committer.name = "Test Committer"
-        mock_commit.commit.committer.email = "committer@example.com"
-        mock_commit.author.login = "testuser"
-        mock_commit.committer.login = "testcommitter"
-        mock_commit.html_url = "https://github.com/owner/repo/commit/abc123"
-        mock_commit.stats.additions = 100
-        mock_commit.stats.deletions = 20
-        mock_commit.stats.total = 120
+        def list_commits(repo, *args):
+            request()
+            return [SimpleNamespace(sha=f"{repo}@{i}") for i in range(4)]
         
-        # Mock file changes
-        mock_file = Mock()
-        mock_file.filename = "src/test.py"
-        mock_file.status = "modified"
-        mock_file.additions = 50
-        mock_file.deletions = 10
-        mock_file.changes = 60
-        mock_file.patch = "@@ -1,3 +1,3 @@\n test"
-        mock_commit.files = [mock_file]
+        def commit_to_dict(commit):
+            request()
+            return {"sha": commit.sha}
         
-        mock_repo.get_commit.return_value = mock_commit
-        mock_github.get_repo.return_value = mock_repo
+        monkeypatch.setattr(wrapper, "_list_commits", list_commits)
+        monkeypatch.setattr(wrapper, "_commit_to_dict", commit_to_dict)
+        repos = [f"owner/repo{i}" for i in range(4)]
+        results = wrapper.get_commits_many(repos, limit=4)
+        
+        assert [len(results[repo]) for repo in repos] == [4] * 4
+        assert peak == 2
+
+    @pytest.mark.parametrize("fetch, method", [
+        ("get_commit_details", "get_commit"),
+        ("get_pr_details", "get_pull"),
+    ])
+    def test_detail_fetches_hold_a_request_slot(self, api_wrapper, mock_github, mock_repo, monkeypatch, fetch, method):
+        """Test that the repository lookup and the detail fetch run inside a request slot."""
+        slots = threading.BoundedSemaphore(1)
+        monkeypatch.setattr(api_wrapper, "_request_slots", slots)
+        monkeypatch.setattr(api_wrapper, "_commit_to_dict", lambda commit, include_files=False: {})
+        monkeypatch.setattr(api_wrapper, "_pr_to_dict", lambda pr, include_commits=False, include_reviews=False: {})
+        held = []
+        
+        def record_slot(*args):
+            # The only slot is taken while the wrapper is fetching
+            held.append(not slots.acquire(blocking=False))
+            return mock_repo
+        
+        mock_github.get_repo.side_effect = record_slot
+        getattr(mock_repo, method).side_effect = record_slot
         api_wrapper.github = mock_github
         
-        commit_data = api_wrapper.get_commit_details("owner/repo", "abc123")
+        getattr(api_wrapper, fetch)("owner/repo", 1)
         
-        assert commit_data["sha"] == "abc123"
-        assert len(commit_data["files"]) == 1
-        file_data = commit_data["files"][0]
-        assert file_data["filename"] == "src/test.py"
-        assert file_data["status"] == "modified"
-        assert file_data["additions"] == 50
-        assert file_data["deletions"] == 10
-        assert file_data["patch"] is not None
+        assert held == [True, True]
+
+    def test_get_pull_requests_since_filter(self, api_wrapper, mock_github, mock_repo):
+        """Test that PRs last updated before since are skipped."""
+        recent = SimpleNamespace(number=2, updated_at=RECENT_UPDATE)
+        stale = SimpleNamespace(number=1, updated_at=STALE_UPDATE)
+        mock_repo.get_pulls.return_value = [recent, stale]
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_pr_to_dict', side_effect=lambda pr: {"number": pr.number}):
+            prs = api_wrapper.get_pull_requests("owner/repo", since="2024-01-01T00:00:00Z")
+
+        assert [pr["number"] for pr in prs] == [2]
+
+    def test_get_commit_details_cached(self, api_wrapper, mock_github, mock_repo):
+        """Test that commit details are fetched once per (repo, sha)."""
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_commit_to_dict', return_value={"sha": "abc123"}) as convert:
+            first = api_wrapper.get_commit_details("owner/repo", "abc123")
+            second = api_wrapper.get_commit_details("owner/repo", "abc123")
+
+        assert first == second
+        assert first is not second
+        mock_repo.get_commit.assert_called_once_with("abc123")
+        convert.assert_called_once()
     
-    def test_get_pr_details_with_commits_and_reviews(self, api_wrapper, mock_github, mock_repo):
+    def test_get_commit_details_returns_copies(self, api_wrapper, mock_github, mock_repo):
+        """Test that changing returned commit details does not change the cached entry."""
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_commit_to_dict', return_value={"sha": "abc123", "files": []}):
+            api_wrapper.get_commit_details("owner/repo", "abc123")["files"].append("leak")
+            assert api_wrapper.get_commit_details("owner/repo", "abc123")["files"] == []
+
+    def test_get_commit_details_cache_is_bounded(self, api_wrapper, mock_github, mock_repo, monkeypatch):
+        """Test that the least recently used commit is evicted past COMMIT_CACHE_SIZE."""
+        monkeypatch.setattr(api_wrapper, "COMMIT_CACHE_SIZE", 2)
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_commit_to_dict', return_value={"sha": "x"}):
+            for sha in ("a", "b", "a", "c"):
+                api_wrapper.get_commit_details("owner/repo", sha)
+
+        assert list(api_wrapper._commit_cache) == [("owner/repo", "a"), ("owner/repo", "c")]
+
+    def test_get_pr_details_cache_expires(self, api_wrapper, mock_github, mock_repo):
+        """Test that PR details are reused within the TTL and refetched after it."""
+        mock_github.get_repo.return_value = mock_repo
+        api_wrapper.github = mock_github
+
+        with patch.object(api_wrapper, '_pr_to_dict', return_value={"number": 42}):
+            with patch('sengy.node.github.time.monotonic', return_value=1000.0):
+                api_wrapper.get_pr_details("owner/repo", 42)
+                api_wrapper.get_pr_details("owner/repo", 42)
+            assert mock_repo.get_pull.call_count == 1
+
+            with patch('sengy.node.github.time.monotonic', return_value=1000.0 + api_wrapper.PR_CACHE_TTL):
+                api_wrapper.get_pr_details("owner/repo", 42)
+            assert mock_repo.get_pull.call_count == 2
+
+    def test_get_pr_details_drops_expired_entries(self, api_wrapper, mock_github, mock_repo):
+        """Test that an expired PR entry is removed when it is looked up."""
+        mock_github.get_repo.return_value = mock_repo
+        mock_repo.get_pull.side_effect = RuntimeError("offline")
+        api_wrapper.github = mock_github
+        api_wrapper._pr_cache[("owner/repo", 42)] = (0.0, {"number": 42})
+
+        with pytest.raises(RuntimeError):
+            api_wrapper.get_pr_details("owner/repo", 42)
+
+        assert ("owner/repo", 42) not in api_wrapper._pr_cache
+
+    def test_get_pr_details_with_commits_and_reviews(self, api_wrapper, mock_github, mock_repo, mock_pr, mock_commit):
         """Test detailed PR retrieval with commits and reviews."""
-        # Setup mock PR
-        mock_pr = Mock(spec=PullRequest)
-        mock_pr.number = 42
-        mock_pr.title = "Detailed PR"
-        mock_pr.body = "Detailed description"
-        mock_pr.state = "merged"
-        mock_pr.merged = True
-        mock_pr.user.name = "Test User"
-        mock_pr.user.email = "test@example.com"
-        mock_pr.user.login = "testuser"
-        mock_pr.created_at = datetime(2024, 1, 15, 8, 0)
-        mock_pr.updated_at = datetime(2024, 1, 18, 17, 0)
-        mock_pr.merged_at = datetime(2024, 1, 18, 17, 30)
-        mock_pr.closed_at = datetime(2024, 1, 18, 17, 30)
-        mock_pr.html_url = "https://github.com/owner/repo/pull/42"
-        mock_pr.head.sha = "def456"
-        mock_pr.base.sha = "abc123"
-        mock_pr.head.ref = "feature"
-        mock_pr.base.ref = "main"
-        mock_pr.changed_files = 5
-        mock_pr.additions = 200
-        mock_pr.deletions = 50
-        mock_pr.labels = []
-        mock_pr.assignees = []
-        mock_pr.requested_reviewers = []
+        mock_pr.raw_data.update({
+            "state": "merged",
+            "merged": True,
+            "merged_at": "2024-01-18T17:30:00Z",
+            "closed_at": "2024-01-18T17:30:00Z",
+        })
         
         # Mock commits
-        mock_commit = Mock()
-        mock_commit.sha = "commit123"
-        mock_commit.commit.message = "PR commit"
-        mock_commit.commit.author.name = "Test Author"
-        mock_commit.commit.author.email = "test@example.com"
-        mock_commit.commit.author.date = datetime(2024, 1, 16, 10, 0)
-        mock_commit.commit.committer.name = "Test Committer"
-        mock_commit.commit.committer.email = "committer@example.com"
-        mock_commit.author.login = "testuser"
-        mock_commit.committer.login = "testcommitter"
-        mock_commit.html_url = "https://github.com/owner/repo/commit/commit123"
-        mock_commit.stats.additions = 30
-        mock_commit.stats.deletions = 5
-        mock_commit.stats.total = 35
+        mock_commit.raw_data["sha"] = "commit123"
         mock_pr.get_commits.return_value = [mock_commit]
         
         # Mock reviews
-        mock_review = Mock()
-        mock_review.id = 123
-        mock_review.user.login = "reviewer"
-        mock_review.state = "APPROVED"
-        mock_review.body = "Looks good!"
-        mock_review.submitted_at = datetime(2024, 1, 17, 14, 0)
+        mock_review = SimpleNamespace(raw_data={
+            "id": 123,
+            "user": {"login": "reviewer"},
+            "state": "APPROVED",
+            "body": "Looks good!",
+            "submitted_at": "2024-01-17T14:00:00Z"
+        })
         mock_pr.get_reviews.return_value = [mock_review]
         
         mock_repo.get_pull.return_value = mock_pr
@@ -288,67 +414,43 @@ class TestGitHubAPIWrapper:
         assert pr_data["reviews"][0]["user"] == "reviewer"
         assert pr_data["reviews"][0]["state"] == "APPROVED"
     
-    def test_commit_to_dict_conversion(self, api_wrapper):
-        """Test _commit_to_dict method."""
-        mock_commit = Mock(spec=Commit)
-        mock_commit.sha = "abc123"
-        mock_commit.commit.message = "Test commit"
-        mock_commit.commit.author.name = "Test Author"
-        mock_commit.commit.author.email = "test@example.com"
-        mock_commit.commit.author.date = datetime(2024, 1, 15, 10, 30)
-        mock_commit.commit.committer.name = "Test Committer"
-        mock_commit.commit.committer.email = "committer@example.com"
-        mock_commit.author.login = "testuser"
-        mock_commit.committer.login = "testcommitter"
-        mock_commit.html_url = "https://github.com/owner/repo/commit/abc123"
-        mock_commit.stats.additions = 10
-        mock_commit.stats.deletions = 5
-        mock_commit.stats.total = 15
+    @pytest.mark.parametrize("source,overrides,expected,absent", [
+        # _commit_to_dict directly, without files
+        ("convert", {}, COMMIT_EXPECTED, ("files",)),
+        # get_commits listing
+        ("list", {}, COMMIT_EXPECTED, ("files",)),
+        # get_commit_details includes file changes
+        ("details", {"files": [COMMIT_FILE]}, {"sha": "abc123", "files": [COMMIT_FILE]}, ()),
+    ])
+    def test_commit_to_dict(self, api_wrapper, mock_github, mock_repo, source, overrides, expected, absent):
+        """Test commit conversion through each API entry point."""
+        commit = build_mock(Commit, COMMIT_BASE_ATTRS, overrides)
+        mock_repo.get_commits.return_value = [commit]
+        mock_repo.get_commit.return_value = commit
+        mock_github.get_repo.return_value = mock_repo
         
-        commit_data = api_wrapper._commit_to_dict(mock_commit)
+        if source == "convert":
+            commit_data = api_wrapper._commit_to_dict(commit)
+        elif source == "list":
+            [commit_data] = api_wrapper.get_commits("owner/repo", limit=1)
+        else:
+            commit_data = api_wrapper.get_commit_details("owner/repo", "abc123")
         
-        assert commit_data["sha"] == "abc123"
-        assert commit_data["message"] == "Test commit"
-        assert commit_data["author"]["name"] == "Test Author"
-        assert commit_data["committer"]["login"] == "testcommitter"
-        assert commit_data["stats"]["total"] == 15
-        assert "files" not in commit_data  # files not included by default
+        assert {key: commit_data[key] for key in expected} == expected
+        assert not any(key in commit_data for key in absent)
     
-    def test_pr_to_dict_conversion(self, api_wrapper):
-        """Test _pr_to_dict method."""
-        mock_pr = Mock(spec=PullRequest)
-        mock_pr.number = 42
-        mock_pr.title = "Test PR"
-        mock_pr.body = "Test description"
-        mock_pr.state = "open"
-        mock_pr.merged = False
-        mock_pr.user.name = "Test User"
-        mock_pr.user.email = "test@example.com"
-        mock_pr.user.login = "testuser"
-        mock_pr.created_at = datetime(2024, 1, 15, 9, 0)
-        mock_pr.updated_at = datetime(2024, 1, 16, 15, 30)
-        mock_pr.merged_at = None
-        mock_pr.closed_at = None
-        mock_pr.html_url = "https://github.com/owner/repo/pull/42"
-        mock_pr.head.sha = "def456"
-        mock_pr.base.sha = "abc123"
-        mock_pr.head.ref = "feature"
-        mock_pr.base.ref = "main"
-        mock_pr.changed_files = 3
-        mock_pr.additions = 50
-        mock_pr.deletions = 10
-        mock_pr.labels = []
-        mock_pr.assignees = []
-        mock_pr.requested_reviewers = []
+    @pytest.mark.parametrize("source", ["convert", "list"])
+    def test_pr_to_dict(self, api_wrapper, mock_github, mock_repo, source):
+        """Test pull request conversion directly and through get_pull_requests."""
+        pr = build_mock(PullRequest, PR_BASE_ATTRS)
+        mock_repo.get_pulls.return_value = [pr]
+        mock_github.get_repo.return_value = mock_repo
         
-        pr_data = api_wrapper._pr_to_dict(mock_pr)
+        if source == "convert":
+            pr_data = api_wrapper._pr_to_dict(pr)
+        else:
+            [pr_data] = api_wrapper.get_pull_requests("owner/repo", limit=1)
         
-        assert pr_data["number"] == 42
-        assert pr_data["title"] == "Test PR"
-        assert pr_data["state"] == "open"
-        assert pr_data["merged"] == False
-        assert pr_data["author"]["login"] == "testuser"
-        assert pr_data["head_ref"] == "feature"
-        assert pr_data["base_ref"] == "main"
+        assert {key: pr_data[key] for key in PR_EXPECTED} == PR_EXPECTED
         assert "commits" not in pr_data  # commits not included by default
-        assert "reviews" not in pr_data  # reviews not included by default
\ No newline at end of file
+        assert "reviews" not in pr_data  # reviews not included by default
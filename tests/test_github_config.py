@@ -3,11 +3,55 @@ Unit tests for GitHub configuration integration.
 """
 import os
 import pytest
+from functools import lru_cache
 from unittest.mock import patch, Mock
 
 from sengy.config import GitHubConfig, SengySettings, get_settings, reload_settings
 
 
+# Environment variables that feed the GitHub section of SengySettings
+GITHUB_ENV_VARS = ("GITHUB", "GITHUB_TOKEN", "GITHUB__TOKEN", "GITHUB__API_URL", "GITHUB__TIMEOUT")
+
+
+@lru_cache(maxsize=None)
+def _build_settings(env: tuple) -> SengySettings:
+    """Build SengySettings once per distinct GitHub environment."""
+    return SengySettings()
+
+
+@pytest.fixture(autouse=True)
+def clean_github_env(monkeypatch):
+    """Start every test without any GitHub environment variables set."""
+    for key in GITHUB_ENV_VARS:
+        monkeypatch.delenv(key, raising=False)
+
+
+@pytest.fixture(scope="module")
+def default_settings():
+    """
+    SengySettings built once under an environment without GitHub variables.
+    Read it directly, or take model_copy(deep=True) before mutating it.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for key in GITHUB_ENV_VARS:
+            mp.delenv(key, raising=False)
+        return SengySettings()
+
+
+@pytest.fixture
+def settings_factory(monkeypatch):
+    """
+    Return a builder that sets the given GitHub environment variables and returns
+    SengySettings for it. Instances are shared between tests with the same
+    environment, so copy one with model_copy(deep=True) before mutating it.
+    """
+    def build(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        return _build_settings(tuple(sorted(env.items())))
+    return build
+
+
 class TestGitHubConfiguration:
     """Test GitHub configuration integration."""
     
@@ -44,46 +88,43 @@ class TestGitHubConfiguration:
         config = GitHubConfig(timeout=1)
         assert config.timeout == 1
     
-    @patch.dict(os.environ, {}, clear=True)
-    def test_sengy_settings_github_config_no_env(self):
+    def test_sengy_settings_github_config_no_env(self, settings_factory):
         """Test SengySettings GitHub config without environment variables."""
-        settings = SengySettings()
+        settings = settings_factory()
         
         assert settings.github.token is None
         assert settings.github.api_url == "https://api.github.com"
         assert settings.github.timeout == 30
         assert settings.get_github_token() is None
     
-    @patch.dict(os.environ, {"GITHUB_TOKEN": "env_token_123"}, clear=True)
-    def test_sengy_settings_github_config_with_env_token(self):
+    def test_sengy_settings_github_config_with_env_token(self, settings_factory):
         """Test SengySettings GitHub config with GITHUB_TOKEN environment variable."""
-        settings = SengySettings()
+        settings = settings_factory(GITHUB_TOKEN="env_token_123")
         
         assert settings.get_github_token() == "env_token_123"
         assert settings.github.api_url == "https://api.github.com"
         assert settings.github.timeout == 30
     
-    @patch.dict(os.environ, {
-        "GITHUB_TOKEN": "env_token_456",
-        "GITHUB__API_URL": "https://enterprise.github.com",
-        "GITHUB__TIMEOUT": "45"
-    }, clear=True)
-    def test_sengy_settings_github_config_with_all_env_vars(self):
+    def test_sengy_settings_github_config_with_all_env_vars(self, settings_factory):
         """Test SengySettings GitHub config with all environment variables."""
-        settings = SengySettings()
+        settings = settings_factory(
+            GITHUB_TOKEN="env_token_456",
+            GITHUB__API_URL="https://enterprise.github.com",
+            GITHUB__TIMEOUT="45"
+        )
         
         assert settings.get_github_token() == "env_token_456"
         assert settings.github.api_url == "https://enterprise.github.com"
         assert settings.github.timeout == 45
     
-    def test_github_config_validator_with_dict(self):
+    def test_github_config_validator_with_dict(self, monkeypatch):
         """Test GitHub config validator when receiving dict input."""
         # Test with empty dict but GITHUB_TOKEN in environment
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "dict_test_token"}, clear=True):
-            result = SengySettings.validate_github_config({})
-            assert result["token"] == "dict_test_token"
+        monkeypatch.setenv("GITHUB_TOKEN", "dict_test_token")
+        result = SengySettings.validate_github_config({})
+        assert result["token"] == "dict_test_token"
     
-    def test_github_config_validator_dict_overrides_env(self):
+    def test_github_config_validator_dict_overrides_env(self, monkeypatch):
         """Test that dict values override environment variables."""
         config_dict = {
             "token": "dict_token",
@@ -91,94 +132,69 @@ class TestGitHubConfiguration:
             "timeout": 120
         }
         
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "env_token"}):
-            result = SengySettings.validate_github_config(config_dict)
-            # Dict values should be preserved
-            assert result["token"] == "dict_token"
-            assert result["api_url"] == "https://dict.github.com"
-            assert result["timeout"] == 120
+        monkeypatch.setenv("GITHUB_TOKEN", "env_token")
+        result = SengySettings.validate_github_config(config_dict)
+        # Dict values should be preserved
+        assert result["token"] == "dict_token"
+        assert result["api_url"] == "https://dict.github.com"
+        assert result["timeout"] == 120
     
-    def test_github_config_validator_partial_dict(self):
+    def test_github_config_validator_partial_dict(self, monkeypatch):
         """Test GitHub config validator with partial dict input."""
         config_dict = {"timeout": 90}
         
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "partial_token"}, clear=True):
-            result = SengySettings.validate_github_config(config_dict)
-            # Should combine dict and environment values
-            assert result["token"] == "partial_token"
-            assert result["timeout"] == 90
+        monkeypatch.setenv("GITHUB_TOKEN", "partial_token")
+        result = SengySettings.validate_github_config(config_dict)
+        # Should combine dict and environment values
+        assert result["token"] == "partial_token"
+        assert result["timeout"] == 90
     
-    @patch.dict(os.environ, {"GITHUB_TOKEN": "env_setup_token"}, clear=True)
-    def test_setup_environment_variables_github(self):
+    def test_setup_environment_variables_github(self, settings_factory, monkeypatch):
         """Test that setup_environment_variables sets GitHub token."""
-        settings = SengySettings()
-        
-        # Clear any existing GITHUB_TOKEN
-        if "GITHUB_TOKEN" in os.environ:
-            original_token = os.environ["GITHUB_TOKEN"]
-        else:
-            original_token = None
-        
-        try:
-            # Remove token to test setup
-            if "GITHUB_TOKEN" in os.environ:
-                del os.environ["GITHUB_TOKEN"]
-            
-            settings.setup_environment_variables()
-            
-            # Should set GITHUB_TOKEN environment variable
-            assert os.environ.get("GITHUB_TOKEN") == "env_setup_token"
-            
-        finally:
-            # Restore original environment
-            if original_token:
-                os.environ["GITHUB_TOKEN"] = original_token
-            elif "GITHUB_TOKEN" in os.environ:
-                del os.environ["GITHUB_TOKEN"]
-    
-    def test_setup_environment_variables_no_github_token(self):
+        settings = settings_factory(GITHUB_TOKEN="env_setup_token")
+        
+        # Remove token to test setup; monkeypatch restores the environment afterwards,
+        # including the OpenAI and Jira variables setup_environment_variables also exports
+        for key in ("GITHUB_TOKEN", "OPENAI_API_KEY", "JIRA_CLOUD"):
+            monkeypatch.delenv(key, raising=False)
+        
+        settings.setup_environment_variables()
+        
+        # Should set GITHUB_TOKEN environment variable
+        assert os.environ.get("GITHUB_TOKEN") == "env_setup_token"
+    
+    def test_setup_environment_variables_no_github_token(self, default_settings):
         """Test setup_environment_variables when no GitHub token is configured."""
-        settings = SengySettings()
+        settings = default_settings.model_copy(deep=True)
         settings.github.token = None
         
         # Should not set GITHUB_TOKEN if not configured
-        original_token = os.environ.get("GITHUB_TOKEN")
-        try:
-            if "GITHUB_TOKEN" in os.environ:
-                del os.environ["GITHUB_TOKEN"]
-            
-            settings.setup_environment_variables()
-            
-            # GITHUB_TOKEN should not be set
-            assert "GITHUB_TOKEN" not in os.environ
-            
-        finally:
-            if original_token:
-                os.environ["GITHUB_TOKEN"] = original_token
+        settings.setup_environment_variables()
+        
+        # GITHUB_TOKEN should not be set
+        assert "GITHUB_TOKEN" not in os.environ
     
-    @patch.dict(os.environ, {"GITHUB_TOKEN": "global_test_token"}, clear=True)
-    def test_get_settings_github_integration(self):
+    def test_get_settings_github_integration(self, monkeypatch):
         """Test get_settings() with GitHub configuration."""
+        monkeypatch.setenv("GITHUB_TOKEN", "global_test_token")
         with patch('sengy.config._settings', None):  # Clear singleton
             settings = get_settings()
             
             assert settings.get_github_token() == "global_test_token"
             assert isinstance(settings.github, GitHubConfig)
     
-    @patch.dict(os.environ, {
-        "GITHUB_TOKEN": "reload_token_123",
-        "GITHUB__API_URL": "https://reload.github.com"
-    }, clear=True)
-    def test_reload_settings_github(self):
+    def test_reload_settings_github(self, monkeypatch):
         """Test reload_settings() with GitHub configuration."""
+        monkeypatch.setenv("GITHUB_TOKEN", "reload_token_123")
+        monkeypatch.setenv("GITHUB__API_URL", "https://reload.github.com")
         settings = reload_settings()
         
         assert settings.get_github_token() == "reload_token_123"
         assert settings.github.api_url == "https://reload.github.com"
     
-    def test_github_config_in_sengy_settings_schema(self):
+    def test_github_config_in_sengy_settings_schema(self, default_settings):
         """Test that GitHub config is properly included in SengySettings."""
-        settings = SengySettings()
+        settings = default_settings
         
         # GitHub config should be an attribute
         assert hasattr(settings, 'github')
@@ -196,39 +212,33 @@ class TestGitHubConfiguration:
         assert hasattr(config.token, 'get_secret_value')
         assert config.token.get_secret_value() == "secret_token_123"
         
-        # String representation should not expose the token
-        config_str = str(config)
-        assert "secret_token_123" not in config_str
-        assert "SecretStr" in config_str or "***" in config_str
+        # Representation should not expose the token
+        assert repr(config.token).startswith("SecretStr(")
+        assert "secret_token_123" not in repr(config.token)
     
-    def test_settings_github_token_getter_with_none(self):
+    def test_settings_github_token_getter_with_none(self, default_settings):
         """Test get_github_token when token is None."""
-        settings = SengySettings()
+        settings = default_settings.model_copy(deep=True)
         settings.github.token = None
         
         assert settings.get_github_token() is None
     
-    def test_settings_github_token_getter_with_value(self):
+    def test_settings_github_token_getter_with_value(self, default_settings):
         """Test get_github_token when token has a value."""
         from pydantic import SecretStr
-        settings = SengySettings()
+        settings = default_settings.model_copy(deep=True)
         settings.github.token = SecretStr("test_getter_token")
         
         assert settings.get_github_token() == "test_getter_token"
     
-    @patch.dict(os.environ, {}, clear=True)
-    def test_github_config_environment_precedence(self):
+    def test_github_config_environment_precedence(self, settings_factory):
         """Test environment variable precedence in GitHub config."""
         # Test that GITHUB_TOKEN takes precedence over GITHUB__TOKEN if both exist
-        with patch.dict(os.environ, {
-            "GITHUB_TOKEN": "standard_token",
-            "GITHUB__TOKEN": "nested_token"
-        }):
-            settings = SengySettings()
-            # Due to pydantic-settings internal processing order, GITHUB__TOKEN 
-            # (nested delimiter format) takes precedence over GITHUB_TOKEN
-            # This is a known limitation of pydantic-settings when both formats exist
-            assert settings.get_github_token() == "nested_token"
+        settings = settings_factory(GITHUB_TOKEN="standard_token", GITHUB__TOKEN="nested_token")
+        # Due to pydantic-settings internal processing order, GITHUB__TOKEN 
+        # (nested delimiter format) takes precedence over GITHUB_TOKEN
+        # This is a known limitation of pydantic-settings when both formats exist
+        assert settings.get_github_token() == "nested_token"
     
     def test_github_config_model_config(self):
         """Test GitHubConfig model configuration."""
@@ -1,9 +1,12 @@
 """
 Unit tests for GitHub document conversion utilities.
 """
+from datetime import datetime, timezone
+
 import pytest
 from langchain.docstore.document import Document
 
+import sengy.node.github as github_module
 from sengy.node.github import (
     github_commit_to_document,
     github_pr_to_document,
@@ -14,7 +17,15 @@ from sengy.node.github import (
 class TestGitHubDocumentConversion:
     """Test GitHub data to Document conversion utilities."""
     
-    @pytest.fixture
+    @pytest.fixture(autouse=True)
+    def clear_document_cache(self):
+        """Start every test with an empty document cache."""
+        github_module._DOCUMENT_CACHE.clear()
+        yield
+        github_module._DOCUMENT_CACHE.clear()
+    
+    # The sample payloads are shared across the session; tests must not mutate them
+    @pytest.fixture(scope="session")
     def sample_commit_data(self):
         """Sample commit data for testing."""
         return {
@@ -62,7 +73,7 @@ class TestGitHubDocumentConversion:
             ]
         }
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def sample_pr_data(self):
         """Sample PR data for testing."""
         return {
@@ -125,25 +136,24 @@ class TestGitHubDocumentConversion:
         
         assert isinstance(doc, Document)
         
-        # Check content includes key information
+        # Check content includes key information, file details and the URL
+        needles = (
+            "abc123456789",
+            "Add new feature implementation",
+            "John Developer",
+            "johndev",
+            "john@example.com",
+            "2024-01-15T10:30:00Z",
+            "+150 -30",
+            "180 total",
+            "Files Changed (3)",
+            "src/feature.py (added): +100 -0",
+            "tests/test_feature.py (added): +45 -0",
+            "docs/api.md (modified): +5 -30",
+            "https://github.com/owner/repo/commit/abc123456789",
+        )
         content = doc.page_content
-        assert "abc123456789" in content
-        assert "Add new feature implementation" in content
-        assert "John Developer" in content
-        assert "johndev" in content
-        assert "john@example.com" in content
-        assert "2024-01-15T10:30:00Z" in content
-        assert "+150 -30" in content
-        assert "180 total" in content
-        
-        # Check file information is included
-        assert "Files Changed (3)" in content
-        assert "src/feature.py (added): +100 -0" in content
-        assert "tests/test_feature.py (added): +45 -0" in content
-        assert "docs/api.md (modified): +5 -30" in content
-        
-        # Check URL is included
-        assert "https://github.com/owner/repo/commit/abc123456789" in content
+        assert [n for n in needles if n not in content] == []
         
         # Check metadata
         metadata = doc.metadata
@@ -181,40 +191,32 @@ class TestGitHubDocumentConversion:
         
         assert isinstance(doc, Document)
         
-        # Check content includes key information
+        # Check content includes key information, description, statistics,
+        # labels and assignees, commits, reviews and the URL
+        needles = (
+            "Pull Request #42",
+            "Feature: Add comprehensive new functionality",
+            "merged",
+            "Jane Developer",
+            "janedev",
+            "2024-01-15T09:00:00Z",
+            "2024-01-18T16:30:00Z",
+            "feature/new-functionality → main",
+            "This PR introduces a new feature",
+            "Closes #123",
+            "8 files, +250 -45",
+            "Labels: enhancement, breaking-change",
+            "Assignees: janedev, reviewer1",
+            "Commits (2)",
+            "commit1: Initial implementation",
+            "commit2: Add tests and documentation",
+            "Reviews (2)",
+            "senior-dev: APPROVED",
+            "security-team: APPROVED",
+            "https://github.com/owner/repo/pull/42",
+        )
         content = doc.page_content
-        assert "Pull Request #42" in content
-        assert "Feature: Add comprehensive new functionality" in content
-        assert "merged" in content
-        assert "Jane Developer" in content
-        assert "janedev" in content
-        assert "2024-01-15T09:00:00Z" in content
-        assert "2024-01-18T16:30:00Z" in content
-        assert "feature/new-functionality → main" in content
-        
-        # Check description is included
-        assert "This PR introduces a new feature" in content
-        assert "Closes #123" in content
-        
-        # Check statistics
-        assert "8 files, +250 -45" in content
-        
-        # Check labels and assignees
-        assert "Labels: enhancement, breaking-change" in content
-        assert "Assignees: janedev, reviewer1" in content
-        
-        # Check commits
-        assert "Commits (2)" in content
-        assert "commit1: Initial implementation" in content
-        assert "commit2: Add tests and documentation" in content
-        
-        # Check reviews
-        assert "Reviews (2)" in content
-        assert "senior-dev: APPROVED" in content
-        assert "security-team: APPROVED" in content
-        
-        # Check URL
-        assert "https://github.com/owner/repo/pull/42" in content
+        assert [n for n in needles if n not in content] == []
         
         # Check metadata
         metadata = doc.metadata
@@ -254,9 +256,7 @@ class TestGitHubDocumentConversion:
     
     def test_github_pr_to_document_no_commits_or_reviews(self, sample_pr_data):
         """Test PR conversion without commits or reviews."""
-        pr_data = sample_pr_data.copy()
-        del pr_data["commits"]
-        del pr_data["reviews"]
+        pr_data = {k: v for k, v in sample_pr_data.items() if k not in ("commits", "reviews")}
         
         doc = github_pr_to_document(pr_data)
         
@@ -331,6 +331,37 @@ class TestGitHubDocumentConversion:
         assert docs[0].metadata["type"] == "github_commit"
         assert docs[1].metadata["type"] == "github_pr"
     
+    def test_github_data_to_document_reuses_cached_documents(self, sample_pr_data):
+        """Test that converting the same record again reuses the cached conversion."""
+        first = github_data_to_document(sample_pr_data)
+        second = github_data_to_document(dict(sample_pr_data))
+        assert len(github_module._DOCUMENT_CACHE) == 1
+
+        third = github_data_to_document(dict(sample_pr_data, title="Retitled PR"))
+
+        assert first == second
+        assert "Retitled PR" in third.page_content
+
+    def test_github_data_to_document_returns_independent_copies(self, sample_commit_data):
+        """Test that mutating a returned document does not leak into later conversions."""
+        first = github_data_to_document(sample_commit_data)
+        first.metadata['x'] = 1
+
+        assert 'x' not in github_data_to_document(sample_commit_data).metadata
+
+    def test_github_data_to_document_keeps_original_values(self, sample_commit_data):
+        """Test that the converter sees the caller's record, not a serialized copy."""
+        committed = datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)
+        doc = github_data_to_document(dict(sample_commit_data, date=committed))
+
+        assert doc.metadata['date'] == committed
+
+    def test_github_data_to_document_non_string_keys(self, sample_commit_data):
+        """Test that records with non-string dict keys still convert."""
+        doc = github_data_to_document(dict(sample_commit_data, stats={1: 2, "total": 3}))
+
+        assert doc.metadata['sha'] == "abc123456789"
+
     def test_github_data_to_document_unknown_data(self):
         """Test github_data_to_document with unknown data structure."""
         unknown_data = {"unknown": "data", "type": "mystery"}
@@ -347,13 +378,10 @@ class TestGitHubDocumentConversion:
         content_lines = doc.page_content.split('\n')
         
         # Check expected content structure
+        prefixes = ("Message:", "Author:", "Date:", "Changes:", "Files Changed", "URL:")
+        seen = {p for line in content_lines for p in prefixes if line.startswith(p)}
         assert content_lines[0].startswith("Commit SHA:")
-        assert any(line.startswith("Message:") for line in content_lines)
-        assert any(line.startswith("Author:") for line in content_lines)
-        assert any(line.startswith("Date:") for line in content_lines)
-        assert any(line.startswith("Changes:") for line in content_lines)
-        assert any(line.startswith("Files Changed") for line in content_lines)
-        assert any(line.startswith("URL:") for line in content_lines)
+        assert set(prefixes) <= seen
     
     def test_pr_document_content_structure(self, sample_pr_data):
         """Test that PR document has well-structured content."""
@@ -361,15 +389,10 @@ class TestGitHubDocumentConversion:
         content_lines = doc.page_content.split('\n')
         
         # Check expected content structure
+        prefixes = (
+            "Title:", "State:", "Author:", "Created:", "Merged:", "Branches:",
+            "Changes:", "Labels:", "Commits", "Reviews", "URL:",
+        )
+        seen = {p for line in content_lines for p in prefixes if line.startswith(p)}
         assert content_lines[0].startswith("Pull Request #")
-        assert any(line.startswith("Title:") for line in content_lines)
-        assert any(line.startswith("State:") for line in content_lines)
-        assert any(line.startswith("Author:") for line in content_lines)
-        assert any(line.startswith("Created:") for line in content_lines)
-        assert any(line.startswith("Merged:") for line in content_lines)
-        assert any(line.startswith("Branches:") for line in content_lines)
-        assert any(line.startswith("Changes:") for line in content_lines)
-        assert any(line.startswith("Labels:") for line in content_lines)
-        assert any(line.startswith("Commits") for line in content_lines)
-        assert any(line.startswith("Reviews") for line in content_lines)
-        assert any(line.startswith("URL:") for line in content_lines)
\ No newline at end of file
+        assert set(prefixes) <= seen
\ No newline at end of file
@@ -2,35 +2,80 @@
 Unit tests for PowerGitHubToolkit and related tools.
 """
 import pytest
+from functools import lru_cache
 from unittest.mock import Mock, patch, MagicMock
 from langchain.tools import BaseTool
 from langgraph.types import Command
 
-from sengy.node.github import PowerGitHubToolkit, GitHubAPIWrapper
+from sengy.node.github import PowerGitHubToolkit
+
+
+@lru_cache(maxsize=None)
+def _schema(args_schema) -> dict:
+    """JSON schema of a tool's args model, generated once per model class."""
+    return args_schema.model_json_schema()
+
+
+def _assert_command(result, key, value):
+    """Assert a tool returned a Command storing value under key in shared_data."""
+    assert isinstance(result, Command)
+    shared_data = result.update["shared_data"]
+    assert key in shared_data
+    assert shared_data[key] == value
+
+
+class _StubAPI:
+    """Plain stand-in for GitHubAPIWrapper with a Mock for each method the tools call."""
+    
+    METHODS = ("get_commits", "get_commits_many", "get_pull_requests",
+               "get_commit_details", "get_pr_details")
+    
+    def __init__(self):
+        for name in self.METHODS:
+            setattr(self, name, Mock())
+    
+    def reset_mock(self):
+        """Clear calls, return values and side effects on every method."""
+        for name in self.METHODS:
+            getattr(self, name).reset_mock(return_value=True, side_effect=True)
 
 
 class TestPowerGitHubToolkit:
     """Test the PowerGitHubToolkit class."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_api_wrapper(self):
-        """Create a mock GitHubAPIWrapper."""
-        return Mock(spec=GitHubAPIWrapper)
+        """Create a stub GitHubAPIWrapper, shared by the session's toolkit."""
+        return _StubAPI()
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def toolkit(self, mock_api_wrapper):
         """Create PowerGitHubToolkit with mocked API."""
         return PowerGitHubToolkit(mock_api_wrapper)
     
-    def test_get_tools(self, toolkit):
+    @pytest.fixture(scope="session")
+    def tools(self, toolkit):
+        """Build the toolkit's tools once; they call through to the shared mock API."""
+        return toolkit.get_tools()
+    
+    @pytest.fixture(scope="session")
+    def tools_by_name(self, tools):
+        """Index the toolkit's tools by name."""
+        return {tool.name: tool for tool in tools}
+    
+    @pytest.fixture(autouse=True)
+    def reset_api_wrapper(self, mock_api_wrapper):
+        """Clear calls, return values and side effects left by the previous test."""
+        mock_api_wrapper.reset_mock()
+    
+    def test_get_tools(self, tools):
         """Test that toolkit returns the correct tools."""
-        tools = toolkit.get_tools()
-        
-        assert len(tools) == 4
+        assert len(tools) == 5
         tool_names = [tool.name for tool in tools]
         
         expected_tools = [
             "get_github_commits",
+            "get_github_commits_many",
             "get_github_pull_requests", 
             "get_github_commit_details",
             "get_github_pr_details"
@@ -43,161 +88,121 @@ class TestPowerGitHubToolkit:
         for tool in tools:
             assert isinstance(tool, BaseTool)
     
-    def test_get_commits_tool_function(self, toolkit, mock_api_wrapper):
-        """Test get_github_commits tool functionality."""
-        # Setup mock data
-        mock_commits = [
+    @pytest.mark.parametrize("tool_name,api_method,call_kwargs,expected_api_args,key_prefix,mock_return", [
+        pytest.param(
+            "get_github_commits", "get_commits",
+            {"repo": "owner/repo", "tool_call_id": "test_call_123", "since": "2024-01-01T00:00:00Z", "limit": 10},
+            # repo, since, until, author, path, limit
+            ("owner/repo", "2024-01-01T00:00:00Z", None, None, None, 10),
+            "github.commits",
+            [
+                {
+                    "sha": "abc123",
+                    "message": "Test commit",
+                    "author": {"name": "Test Author", "login": "testuser"},
+                    "date": "2024-01-15T10:30:00Z"
+                }
+            ],
+            id="commits",
+        ),
+        pytest.param(
+            "get_github_pull_requests", "get_pull_requests",
+            {"repo": "owner/repo", "tool_call_id": "test_call_456", "state": "all", "limit": 20},
+            # repo, state, since, limit
+            ("owner/repo", "all", None, 20),
+            "github.prs",
+            [
+                {
+                    "number": 42,
+                    "title": "Test PR",
+                    "state": "open",
+                    "author": {"login": "testuser"}
+                }
+            ],
+            id="pull_requests",
+        ),
+        pytest.param(
+            "get_github_commit_details", "get_commit_details",
+            {"repo": "owner/repo", "sha": "abc123", "tool_call_id": "test_call_789"},
+            ("owner/repo", "abc123"),
+            "github.commit",
             {
                 "sha": "abc123",
-                "message": "Test commit",
-                "author": {"name": "Test Author", "login": "testuser"},
-                "date": "2024-01-15T10:30:00Z"
-            }
-        ]
-        mock_api_wrapper.get_commits.return_value = mock_commits
-        
-        tools = toolkit.get_tools()
-        commits_tool = next(tool for tool in tools if tool.name == "get_github_commits")
-        
-        # Test tool execution - it should return a Command instance
-        result = commits_tool.func(
-            repo="owner/repo",
-            tool_call_id="test_call_123",
-            since="2024-01-01T00:00:00Z",
-            limit=10
-        )
-        
-        # Verify API was called correctly
-        mock_api_wrapper.get_commits.assert_called_once_with(
-            "owner/repo",
-            "2024-01-01T00:00:00Z",
-            None,  # until
-            None,  # author
-            None,  # path
-            10     # limit
-        )
-        
-        # Verify Command was returned with correct data
-        assert isinstance(result, Command)
-        assert "shared_data" in result.update
-        assert "github.commits.test_call_123" in result.update["shared_data"]
-        assert result.update["shared_data"]["github.commits.test_call_123"] == mock_commits
-    
-    def test_get_pull_requests_tool_function(self, toolkit, mock_api_wrapper):
-        """Test get_github_pull_requests tool functionality."""
-        # Setup mock data
-        mock_prs = [
+                "message": "Detailed commit",
+                "files": [
+                    {"filename": "src/test.py", "status": "modified"}
+                ]
+            },
+            id="commit_details",
+        ),
+        pytest.param(
+            "get_github_pr_details", "get_pr_details",
+            {"repo": "owner/repo", "pr_number": 42, "tool_call_id": "test_call_999"},
+            ("owner/repo", 42),
+            "github.pr",
             {
                 "number": 42,
-                "title": "Test PR",
-                "state": "open",
-                "author": {"login": "testuser"}
-            }
-        ]
-        mock_api_wrapper.get_pull_requests.return_value = mock_prs
-        
-        tools = toolkit.get_tools()
-        prs_tool = next(tool for tool in tools if tool.name == "get_github_pull_requests")
-        
-        # Test tool execution - it should return a Command instance
-        result = prs_tool.func(
-            repo="owner/repo",
-            tool_call_id="test_call_456",
-            state="all",
-            limit=20
-        )
-        
-        # Verify API was called correctly
-        mock_api_wrapper.get_pull_requests.assert_called_once_with(
-            "owner/repo",
-            "all",    # state
-            None,     # since
-            20        # limit
-        )
-        
-        # Verify Command was returned with correct data
-        assert isinstance(result, Command)
-        assert "shared_data" in result.update
-        assert "github.prs.test_call_456" in result.update["shared_data"]
-        assert result.update["shared_data"]["github.prs.test_call_456"] == mock_prs
-    
-    def test_get_commit_details_tool_function(self, toolkit, mock_api_wrapper):
-        """Test get_github_commit_details tool functionality."""
-        # Setup mock data
-        mock_commit = {
-            "sha": "abc123",
-            "message": "Detailed commit",
-            "files": [
-                {"filename": "src/test.py", "status": "modified"}
-            ]
-        }
-        mock_api_wrapper.get_commit_details.return_value = mock_commit
-        
-        tools = toolkit.get_tools()
-        commit_details_tool = next(tool for tool in tools if tool.name == "get_github_commit_details")
+                "title": "Detailed PR",
+                "commits": [{"sha": "commit123"}],
+                "reviews": [{"user": "reviewer", "state": "APPROVED"}]
+            },
+            id="pr_details",
+        ),
+    ])
+    def test_tool_function(self, tools_by_name, mock_api_wrapper, tool_name, api_method,
+                           call_kwargs, expected_api_args, key_prefix, mock_return):
+        """Test that each GitHub tool calls its API method and stores the result in shared memory."""
+        api = getattr(mock_api_wrapper, api_method)
+        api.return_value = mock_return
         
         # Test tool execution - it should return a Command instance
-        result = commit_details_tool.func(
-            repo="owner/repo",
-            sha="abc123",
-            tool_call_id="test_call_789"
-        )
+        result = tools_by_name[tool_name].func(**call_kwargs)
         
         # Verify API was called correctly
-        mock_api_wrapper.get_commit_details.assert_called_once_with("owner/repo", "abc123")
+        assert api.call_count == 1
+        assert api.call_args.args == expected_api_args
+        assert not api.call_args.kwargs
         
         # Verify Command was returned with correct data
-        assert isinstance(result, Command)
-        assert "shared_data" in result.update
-        assert "github.commit.test_call_789" in result.update["shared_data"]
-        assert result.update["shared_data"]["github.commit.test_call_789"] == mock_commit
+        _assert_command(result, f"{key_prefix}.{call_kwargs['tool_call_id']}", mock_return)
     
-    def test_get_pr_details_tool_function(self, toolkit, mock_api_wrapper):
-        """Test get_github_pr_details tool functionality."""
-        # Setup mock data
-        mock_pr = {
-            "number": 42,
-            "title": "Detailed PR",
-            "commits": [{"sha": "commit123"}],
-            "reviews": [{"user": "reviewer", "state": "APPROVED"}]
+    def test_get_commits_many_tool_function(self, tools_by_name, mock_api_wrapper):
+        """Test get_github_commits_many tool functionality."""
+        mock_api_wrapper.get_commits_many.return_value = {
+            "owner/repo1": [{"sha": "abc123", "message": "First"}],
+            "owner/repo2": [{"sha": "def456", "message": "Second"}]
         }
-        mock_api_wrapper.get_pr_details.return_value = mock_pr
         
-        tools = toolkit.get_tools()
-        pr_details_tool = next(tool for tool in tools if tool.name == "get_github_pr_details")
+        many_tool = tools_by_name["get_github_commits_many"]
         
-        # Test tool execution - it should return a Command instance
-        result = pr_details_tool.func(
-            repo="owner/repo",
-            pr_number=42,
-            tool_call_id="test_call_999"
+        result = many_tool.func(
+            repos=["owner/repo1", "owner/repo2"],
+            tool_call_id="test_call_many",
+            limit=5
         )
         
-        # Verify API was called correctly
-        mock_api_wrapper.get_pr_details.assert_called_once_with("owner/repo", 42)
+        api = mock_api_wrapper.get_commits_many
+        assert api.call_count == 1
+        assert api.call_args.args == (["owner/repo1", "owner/repo2"], None, None, None, None, 5)
+        assert not api.call_args.kwargs
         
-        # Verify Command was returned with correct data
         assert isinstance(result, Command)
-        assert "shared_data" in result.update
-        assert "github.pr.test_call_999" in result.update["shared_data"]
-        assert result.update["shared_data"]["github.pr.test_call_999"] == mock_pr
+        commits = result.update["shared_data"]["github.commits.test_call_many"]
+        assert [c["repo"] for c in commits] == ["owner/repo1", "owner/repo2"]
+        assert [c["sha"] for c in commits] == ["abc123", "def456"]
     
-    def test_tool_descriptions(self, toolkit):
+    def test_tool_descriptions(self, tools):
         """Test that tools have proper descriptions."""
-        tools = toolkit.get_tools()
-        
         for tool in tools:
             assert tool.description is not None
             assert len(tool.description) > 20  # Reasonable description length
             assert "GitHub" in tool.description
     
-    def test_tool_parameters(self, toolkit):
+    def test_tool_parameters(self, tools_by_name):
         """Test that tools have correct parameter schemas."""
-        tools = toolkit.get_tools()
-        
-        commits_tool = next(tool for tool in tools if tool.name == "get_github_commits")
+        commits_tool = tools_by_name["get_github_commits"]
         # Check that repo parameter is required
-        schema = commits_tool.args_schema.model_json_schema()
+        schema = _schema(commits_tool.args_schema)
         assert "repo" in schema["properties"]
         assert "repo" in schema["required"]
         
@@ -213,12 +218,11 @@ class TestPowerGitHubToolkit:
         for param in optional_params:
             assert param not in schema["required"]
     
-    def test_memory_key_generation(self, toolkit, mock_api_wrapper):
+    def test_memory_key_generation(self, tools_by_name, mock_api_wrapper):
         """Test that memory keys are generated consistently."""
         mock_api_wrapper.get_commits.return_value = []
         
-        tools = toolkit.get_tools()
-        commits_tool = next(tool for tool in tools if tool.name == "get_github_commits")
+        commits_tool = tools_by_name["get_github_commits"]
         
         result = commits_tool.func(
             repo="owner/repo",
@@ -233,13 +237,12 @@ class TestPowerGitHubToolkit:
         expected_key = "github.commits.unique_call_id_123"
         assert expected_key in shared_data
     
-    def test_error_handling(self, toolkit, mock_api_wrapper):
+    def test_error_handling(self, tools_by_name, mock_api_wrapper):
         """Test error handling in tools."""
         # Make API wrapper raise an exception
         mock_api_wrapper.get_commits.side_effect = Exception("API Error")
         
-        tools = toolkit.get_tools()
-        commits_tool = next(tool for tool in tools if tool.name == "get_github_commits")
+        commits_tool = tools_by_name["get_github_commits"]
         
         # Tool should let the exception propagate (to be handled by agent)
         with pytest.raises(Exception, match="API Error"):
@@ -248,12 +251,10 @@ class TestPowerGitHubToolkit:
                 tool_call_id="test_call"
             )
     
-    def test_tool_argument_types(self, toolkit):
+    def test_tool_argument_types(self, tools_by_name):
         """Test that tool arguments have correct types."""
-        tools = toolkit.get_tools()
-        
-        commits_tool = next(tool for tool in tools if tool.name == "get_github_commits")
-        schema = commits_tool.args_schema.model_json_schema()
+        commits_tool = tools_by_name["get_github_commits"]
+        schema = _schema(commits_tool.args_schema)
         
         # String parameters
         string_params = ["repo", "since", "until", "author", "path"]
@@ -266,6 +267,6 @@ class TestPowerGitHubToolkit:
             assert schema["properties"]["limit"]["type"] == "integer"
         
         # PR details tool should have integer pr_number
-        pr_tool = next(tool for tool in tools if tool.name == "get_github_pr_details")
-        pr_schema = pr_tool.args_schema.model_json_schema()
+        pr_tool = tools_by_name["get_github_pr_details"]
+        pr_schema = _schema(pr_tool.args_schema)
         assert pr_schema["properties"]["pr_number"]["type"] == "integer"
\ No newline at end of file
@@ -1,12 +1,40 @@
 """
 Unit tests for Jira utility functions.
 """
+from datetime import date
+
 import pytest
 
-from sengy.node.jira import ticket_to_document
+from sengy.node.jira import (
+    MaxJiraAPIWrapper,
+    ticket_to_document,
+    tickets_to_documents,
+)
 
 from .fixtures import create_sample_ticket, sample_ticket
-from .test_utils import count_ticket_fields_in_content, verify_document_structure
+from .test_utils import (
+    count_ticket_fields_in_content,
+    verify_document_structure,
+    verify_documents_structure,
+)
+
+# Every optional ticket field populated
+ALL_FIELDS_TICKET = {
+    "key": "FULL-TEST",
+    "summary": "Full featured test ticket",
+    "status": "In Review",
+    "priority": "Critical",
+    "description": "Detailed description of the issue",
+    "comments": [
+        {"author": {"displayName": "Tester"}, "body": "Test comment"}
+    ],
+    "labels": ["test", "full"],
+    "components": ["Frontend", "Backend"],
+    "affects_versions": ["1.0.0", "1.1.0"],
+    "flags": ["urgent", "customer-facing"],
+    "issue_type": "Story",
+    "updated": "2024-01-15T10:30:00.000Z",
+}
 
 
 class TestTicketToDocument:
@@ -21,29 +49,10 @@ class TestTicketToDocument:
         
         # Check content contains key fields
         fields = count_ticket_fields_in_content(doc.page_content)
-        assert fields['key'], "Document should contain key"
-        assert fields['summary'], "Document should contain summary"
-        assert fields['status'], "Document should contain status"
-        assert fields['priority'], "Document should contain priority"
-    
-    def test_ticket_with_comments(self):
-        """Test ticket with multiple comments."""
-        ticket = create_sample_ticket(
-            key="COMMENT-TEST",
-            comments=[
-                {"author": {"displayName": "Alice"}, "body": "First comment"},
-                {"author": {"displayName": "Bob"}, "body": "Second comment"},
-                {"author": {"displayName": "Charlie"}, "body": "Third comment"}
-            ]
-        )
-        
-        doc = ticket_to_document(ticket)
-        
-        # Check all comments are included
-        assert "Alice: First comment" in doc.page_content
-        assert "Bob: Second comment" in doc.page_content
-        assert "Charlie: Third comment" in doc.page_content
-        assert "Comments (3)" in doc.page_content
+        assert fields.key, "Document should contain key"
+        assert fields.summary, "Document should contain summary"
+        assert fields.status, "Document should contain status"
+        assert fields.priority, "Document should contain priority"
     
     def test_ticket_with_no_comments(self):
         """Test ticket without comments."""
@@ -57,20 +66,6 @@ class TestTicketToDocument:
         # Should not contain comments section
         assert "Comments" not in doc.page_content
     
-    def test_ticket_with_labels_and_components(self):
-        """Test ticket with labels and components."""
-        ticket = create_sample_ticket(
-            key="LABELS-TEST",
-            labels=["urgent", "bug", "backend"],
-            components=["Authentication", "Database", "API"]
-        )
-        
-        doc = ticket_to_document(ticket)
-        
-        # Check labels and components
-        assert "Labels: urgent, bug, backend" in doc.page_content
-        assert "Components: Authentication, Database, API" in doc.page_content
-    
     def test_ticket_with_empty_optional_fields(self):
         """Test ticket with empty optional fields."""
         ticket = create_sample_ticket(
@@ -91,35 +86,64 @@ class TestTicketToDocument:
     
     def test_ticket_with_all_fields(self):
         """Test ticket with all possible fields populated."""
-        ticket = create_sample_ticket(
-            key="FULL-TEST",
-            summary="Full featured test ticket",
-            status="In Review",
-            priority="Critical",
-            description="Detailed description of the issue",
-            comments=[
-                {"author": {"displayName": "Tester"}, "body": "Test comment"}
-            ],
-            labels=["test", "full"],
-            components=["Frontend", "Backend"],
-            affects_versions=["1.0.0", "1.1.0"],
-            flags=["urgent", "customer-facing"],
-            issue_type="Story",
-            updated="2024-01-15T10:30:00.000Z"
-        )
-        
-        doc = ticket_to_document(ticket)
+        doc = ticket_to_document(create_sample_ticket(**ALL_FIELDS_TICKET))
         
         # Verify all fields are present
         content_fields = count_ticket_fields_in_content(doc.page_content)
-        for field, present in content_fields.items():
+        for field, present in content_fields._asdict().items():
             assert present, f"Field {field} should be present in content"
+    
+    @pytest.mark.parametrize("ticket_kwargs,expected_substrings", [
+        pytest.param(
+            {
+                "key": "COMMENT-TEST",
+                "comments": [
+                    {"author": {"displayName": "Alice"}, "body": "First comment"},
+                    {"author": {"displayName": "Bob"}, "body": "Second comment"},
+                    {"author": {"displayName": "Charlie"}, "body": "Third comment"}
+                ]
+            },
+            ["Alice: First comment", "Bob: Second comment", "Charlie: Third comment", "Comments (3)"],
+            id="comments",
+        ),
+        pytest.param(
+            {
+                "key": "LABELS-TEST",
+                "labels": ["urgent", "bug", "backend"],
+                "components": ["Authentication", "Database", "API"]
+            },
+            ["Labels: urgent, bug, backend", "Components: Authentication, Database, API"],
+            id="labels_and_components",
+        ),
+        pytest.param(
+            ALL_FIELDS_TICKET,
+            [
+                "Affects Versions: 1.0.0, 1.1.0",
+                "Flags: urgent, customer-facing",
+                "Issue Type: Story",
+                "Updated: 2024-01-15T10:30:00.000Z",
+            ],
+            id="all_fields",
+        ),
+        pytest.param(
+            {
+                "key": "MALFORMED-TEST",
+                "comments": [
+                    "string comment",  # Not a dict
+                    {"author": {"displayName": "Valid"}, "body": "Valid comment"},
+                    {"malformed": "comment"}  # Missing expected fields
+                ]
+            },
+            ["string comment", "Valid: Valid comment"],
+            id="malformed_comments",
+        ),
+    ])
+    def test_ticket_content_substrings(self, ticket_kwargs, expected_substrings):
+        """Test that ticket variations render the expected lines, without crashing on malformed data."""
+        content = ticket_to_document(create_sample_ticket(**ticket_kwargs)).page_content
         
-        # Check specific content
-        assert "Affects Versions: 1.0.0, 1.1.0" in doc.page_content
-        assert "Flags: urgent, customer-facing" in doc.page_content
-        assert "Issue Type: Story" in doc.page_content
-        assert "Updated: 2024-01-15T10:30:00.000Z" in doc.page_content
+        for expected in expected_substrings:
+            assert expected in content
     
     def test_metadata_structure(self, sample_ticket):
         """Test that metadata has correct structure."""
@@ -132,32 +156,110 @@ class TestTicketToDocument:
             'issue_type': 'Bug'
         }
         
+        metadata = doc.metadata
         for key, expected_value in expected_metadata.items():
-            assert key in doc.metadata
-            assert doc.metadata[key] == expected_value
+            assert key in metadata
+            assert metadata[key] == expected_value
     
     def test_content_length_reasonable(self, sample_ticket):
         """Test that content length is reasonable."""
         doc = ticket_to_document(sample_ticket)
         
         # Should have substantial content but not excessive
-        assert len(doc.page_content) > 50, "Content should be substantial"
-        assert len(doc.page_content) < 5000, "Content should not be excessive"
+        length = len(doc.page_content)
+        assert length > 50, "Content should be substantial"
+        assert length < 5000, "Content should not be excessive"
+
+
+class TestTicketsToDocuments:
+    """Test the tickets_to_documents function."""
     
-    def test_malformed_comments(self):
-        """Test handling of malformed comment data."""
-        ticket = create_sample_ticket(
-            key="MALFORMED-TEST",
-            comments=[
-                "string comment",  # Not a dict
-                {"author": {"displayName": "Valid"}, "body": "Valid comment"},
-                {"malformed": "comment"}  # Missing expected fields
-            ]
-        )
+    def test_unconvertible_items_fall_back_individually(self, sample_ticket):
+        """Test that one bad item does not affect the conversion of the others."""
+        docs = tickets_to_documents([sample_ticket, "plain note", [date(2024, 1, 1)]])
         
-        doc = ticket_to_document(ticket)
+        assert len(docs) == 3
+        assert verify_document_structure(docs[0], expected_key="TEST-123")
+        assert docs[1].page_content == '"plain note"'
+        assert docs[2].page_content == '["2024-01-01"]'
+    
+    def test_tickets_convert_in_order(self):
+        """Test that each ticket becomes a well-formed Document, keeping input order."""
+        keys = [f"ORDER-{i}" for i in range(5)]
+        docs = tickets_to_documents([create_sample_ticket(key=key) for key in keys])
         
-        # Should handle gracefully
-        assert "string comment" in doc.page_content
-        assert "Valid: Valid comment" in doc.page_content
-        # Should not crash on malformed comment
\ No newline at end of file
+        assert verify_documents_structure(docs, expected_keys=keys) == [True] * len(keys)
+    
+    def test_documents_structure_matches_single_checks(self):
+        """Test that the list check rejects what the single check rejects, and mismatched keys."""
+        docs = tickets_to_documents([create_sample_ticket(key="ONE-1"), create_sample_ticket(key="TWO-2")])
+        docs[1].page_content = ""
+        
+        assert verify_documents_structure(docs) == [True, False]
+        with pytest.raises(ValueError):
+            verify_documents_structure(docs, expected_keys=["ONE-1"])
+
+
+class TestParseIssues:
+    """Test MaxJiraAPIWrapper.parse_issues."""
+
+    @pytest.fixture
+    def raw_issue(self):
+        """A raw issue as returned by the Jira JQL endpoint."""
+        return {
+            "key": "PARSE-1",
+            "fields": {
+                "summary": "Parse me",
+                "created": "2024-01-15T10:30:00.000+0000",
+                "updated": "2024-01-16T10:30:00.000+0000",
+                "status": {"name": "Open"},
+                "priority": {"name": "High"},
+                "assignee": {"displayName": "Alice"},
+                "issuetype": {"name": "Bug"},
+                "description": "A description",
+                "labels": ["backend"],
+                "comment": {"comments": [{"body": "hi"}]},
+                "aggregatetimeoriginalestimate": 7200,
+                "timeestimate": 5400,
+                "progress": {"progress": 1800},
+                "components": [{"name": "API"}],
+                "versions": [{"name": "1.0"}],
+                "customfield_12310250": None,
+            },
+        }
+
+    def test_time_fields_converted_to_hours(self, raw_issue):
+        """Test that time estimates are converted from seconds to hours."""
+        api = MaxJiraAPIWrapper.model_construct()
+        parsed = api.parse_issues({"issues": [raw_issue]})[0]
+
+        assert parsed["aggregatetimeoriginalestimate"] == "2.0h"
+        assert parsed["timeestimate"] == "1.5h"
+        assert parsed["progress"] == "0.5h"
+        assert parsed["aggregatetimeestimate"] == "0h"
+        assert parsed["aggregateprogress"] == "0h"
+
+    def test_missing_or_zero_time_fields_render_0h(self, raw_issue):
+        """Test that absent, null and zero durations all render as 0h."""
+        raw_issue["fields"].update(timeestimate=None, aggregatetimeoriginalestimate=0, progress={})
+        api = MaxJiraAPIWrapper.model_construct()
+        parsed = api.parse_issues({"issues": [raw_issue]})[0]
+
+        assert parsed["timeestimate"] == "0h"
+        assert parsed["aggregatetimeoriginalestimate"] == "0h"
+        assert parsed["progress"] == "0h"
+        assert parsed["aggregatetimeestimate"] == "0h"
+
+    def test_extra_fields_extracted(self, raw_issue):
+        """Test that the extended fields are pulled from the raw issue."""
+        api = MaxJiraAPIWrapper.model_construct()
+        parsed = api.parse_issues({"issues": [raw_issue]})[0]
+
+        assert parsed["key"] == "PARSE-1"
+        assert parsed["labels"] == ["backend"]
+        assert parsed["comments"] == [{"body": "hi"}]
+        assert parsed["components"] == ["API"]
+        assert parsed["affects_versions"] == ["1.0"]
+        assert parsed["flags"] == []
+        assert parsed["issue_type"] == "Bug"
+        assert parsed["description"] == "A description"
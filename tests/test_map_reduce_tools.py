@@ -5,22 +5,37 @@ import json
 from unittest.mock import Mock, patch
 
 import pytest
+from langchain.chains.summarize import load_summarize_chain
+from langchain.docstore.document import Document
+from langchain_core.messages import AIMessage, HumanMessage
 
+import sengy.node.analysis as analysis_module
+import sengy.node.summarise as summarise_module
+from sengy.config import reload_settings
 from sengy.node.analysis import analyze_content_tool
-from sengy.node.summarise import summarise_content_tool
+from sengy.node.summarise import (
+    DimensionSummary,
+    SummaryModel,
+    summarise_content,
+    summarise_content_tool,
+)
 
 from .fixtures import (
+    MOCK_LLM_ANALYSIS_RESPONSE,
+    MOCK_LLM_SUMMARY_RESPONSE,
     MOCK_MAP_REDUCE_ANALYSIS,
     MOCK_MAP_REDUCE_SUMMARY,
     large_ticket_dataset,
     small_ticket_dataset,
 )
 from .test_utils import (
+    _PREBUILT_MESSAGES,
     create_fake_llm,
     mock_get_stream_writer,
     mock_get_stream_writer_for_analysis,
     mock_get_stream_writer_for_summarise,
     mock_map_reduce_chain,
+    mock_map_reduce_llm,
 )
 
 
@@ -29,249 +44,412 @@ def get_tool_function(tool_obj):
     return tool_obj.func
 
 
+# Summarize chains built once at import; tests take them through _chain()
+_CHAIN_SUMMARY = mock_map_reduce_chain(MOCK_MAP_REDUCE_SUMMARY)
+_CHAIN_ANALYSIS = mock_map_reduce_chain(MOCK_MAP_REDUCE_ANALYSIS)
+
+
+def _chain(template):
+    """
+    Hand out a pre-built chain mock with its call history cleared. Configured
+    return values survive reset_mock(), and a copy.copy would share the invoke
+    child anyway, so the template itself is reused.
+    """
+    template.reset_mock()
+    return template
+
+
 class TestMapReduceSummariseTickets:
     """Test the summarise_content_tool tool."""
     
-    @patch('sengy.node.summarise.load_summarize_chain')
-    def test_summarise_small_dataset(self, mock_chain_loader, small_ticket_dataset):
-        """Test summarization with small dataset using memory_key."""
-        # Setup mocks
-        mock_chain = mock_map_reduce_chain(MOCK_MAP_REDUCE_SUMMARY)
-        mock_chain_loader.return_value = mock_chain
-        
-        patch_obj, mock_writer = mock_get_stream_writer_for_summarise()
+    @pytest.fixture(autouse=True)
+    def mock_writer(self, mock_stream_writer):
+        """Capture what the summarise module sends to the module's shared stream writer."""
+        patch_obj, writer = mock_get_stream_writer_for_summarise(mock_stream_writer)
         with patch_obj:
-            # Create mock state with shared data
-            mock_state = {
-                "shared_data": {
-                    "test_tickets": small_ticket_dataset
-                }
+            yield writer
+    
+    @pytest.fixture(autouse=True)
+    def fresh_structured_llm(self):
+        """Keep the cached structured LLM from leaking between tests."""
+        summarise_module._structured_llm.cache_clear()
+        yield
+        summarise_module._structured_llm.cache_clear()
+    
+    @pytest.fixture
+    def map_reduce_llm(self):
+        """Patch get_llm with a map-reduce chat model mock answering MOCK_MAP_REDUCE_SUMMARY."""
+        mock_llm = mock_map_reduce_llm(MOCK_MAP_REDUCE_SUMMARY)
+        with patch.object(summarise_module, 'get_llm', return_value=mock_llm):
+            yield mock_llm
+    
+    def test_summarise_small_dataset(self, map_reduce_llm, small_ticket_dataset):
+        """Test summarization with small dataset using memory_key."""
+        # Create mock state with shared data
+        mock_state = {
+            "shared_data": {
+                "test_tickets": small_ticket_dataset
             }
-            
-            # Get the underlying function and call it directly
-            summarise_func = get_tool_function(summarise_content_tool)
-            result = summarise_func("priority,complexity", memory_key="test_tickets", state=mock_state)
-            
-            # Verify result structure
-            assert "messages" in result
-            assert len(result["messages"]) == 1
-            assert MOCK_MAP_REDUCE_SUMMARY in result["messages"][0].content
+        }
+        
+        # Get the underlying function and call it directly
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority,complexity", memory_key="test_tickets", state=mock_state)
+        
+        # Verify result structure
+        assert "messages" in result
+        assert len(result["messages"]) == 1
+        assert result["messages"][0].content == MOCK_MAP_REDUCE_SUMMARY
     
-    @patch('sengy.node.summarise.load_summarize_chain')
-    def test_summarise_large_dataset(self, mock_chain_loader, large_ticket_dataset):
+    def test_summarise_large_dataset(self, map_reduce_llm, large_ticket_dataset):
         """Test summarization with large dataset (25 tickets) using memory_key."""
-        # Setup mocks
-        mock_chain = mock_map_reduce_chain(MOCK_MAP_REDUCE_SUMMARY)
-        mock_chain_loader.return_value = mock_chain
+        mock_llm = map_reduce_llm
         
-        patch_obj, mock_writer = mock_get_stream_writer_for_summarise()
-        with patch_obj:
-            # Create mock state with shared data
-            mock_state = {
-                "shared_data": {
-                    "large_tickets": large_ticket_dataset
-                }
+        # Create mock state with shared data
+        mock_state = {
+            "shared_data": {
+                "large_tickets": large_ticket_dataset
             }
-            
-            # Get the underlying function and call it directly
-            summarise_func = get_tool_function(summarise_content_tool)
-            result = summarise_func("priority,complexity,impact", memory_key="large_tickets", state=mock_state)
-            
-            # Verify chain was called with documents
-            mock_chain.invoke.assert_called_once()
-            args = mock_chain.invoke.call_args[0]
-            documents = args[0]
-            
-            # Should have 25 documents (one per ticket)
-            assert len(documents) == 25
-            
-            # Each document should have proper structure
-            for doc in documents:
-                assert hasattr(doc, 'page_content')
-                assert hasattr(doc, 'metadata')
-                assert len(doc.page_content) > 10
+        }
+        
+        # Get the underlying function and call it directly
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority,complexity,impact", memory_key="large_tickets", batch_size=1, state=mock_state)
+        
+        # Should have one map call per ticket plus a single reduce call
+        prompts = [call.args[0] for call in mock_llm.ainvoke.call_args_list]
+        assert len(prompts) == 26
+        
+        # Each map prompt should carry its ticket's document content
+        for ticket, prompt in zip(large_ticket_dataset, prompts[:25]):
+            assert f"Key: {ticket['key']}" in prompt
+        
+        # The reduce prompt combines the mapped outputs
+        assert MOCK_MAP_REDUCE_SUMMARY in prompts[-1]
+        assert result["messages"][0].content == MOCK_MAP_REDUCE_SUMMARY
+    
+    def test_summarise_batches_map_calls(self, map_reduce_llm, large_ticket_dataset):
+        """Test that tickets are mapped in batches and flattened back in order."""
+        def respond(prompt):
+            if "Item 1:" not in prompt:
+                return AIMessage(content=MOCK_MAP_REDUCE_SUMMARY)
+            count = prompt.count("\nItem ") + 1
+            items = [{"index": i, "analysis": f"analysis {i}"} for i in range(1, count + 1)]
+            return AIMessage(content=json.dumps({"items": items}))
+        
+        mock_llm = map_reduce_llm
+        mock_llm.ainvoke.side_effect = respond
+        
+        mock_state = {"shared_data": {"large_tickets": large_ticket_dataset}}
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority", memory_key="large_tickets", batch_size=5, state=mock_state)
+        
+        # 25 tickets in batches of 5 is 5 map calls, plus the reduce call
+        prompts = [call.args[0] for call in mock_llm.ainvoke.call_args_list]
+        assert len(prompts) == 6
+        assert all(f"analysis {i}\n" in prompts[-1] for i in range(1, 6))
+        assert prompts[-1].count("analysis ") == 25
+        assert result["messages"][0].content == MOCK_MAP_REDUCE_SUMMARY
+    
+    def test_summarise_batch_parse_failure_falls_back(self, map_reduce_llm, small_ticket_dataset):
+        """Test that an unparseable batch response is retried per ticket."""
+        mock_llm = map_reduce_llm
+        mock_llm.ainvoke.return_value = AIMessage(content="not json")
+        
+        mock_state = {"shared_data": {"test_tickets": small_ticket_dataset}}
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        summarise_func("priority", memory_key="test_tickets", state=mock_state)
+        
+        # One batch call, one retry per ticket, then the reduce call
+        assert mock_llm.ainvoke.call_count == 1 + len(small_ticket_dataset) + 1
+    
+    def test_summarise_maps_duplicate_tickets_once(self, map_reduce_llm, small_ticket_dataset):
+        """Test that identical tickets share one map call but all reach the reduce step."""
+        mock_llm = map_reduce_llm
+        
+        mock_state = {"shared_data": {"test_tickets": small_ticket_dataset * 3}}
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        summarise_func("priority", memory_key="test_tickets", batch_size=1, state=mock_state)
+        
+        # One map call per distinct ticket, then the reduce call
+        prompts = [call.args[0] for call in mock_llm.ainvoke.call_args_list]
+        assert len(prompts) == len(small_ticket_dataset) + 1
+        assert prompts[-1].count(MOCK_MAP_REDUCE_SUMMARY) == 3 * len(small_ticket_dataset)
+    
+    def test_summarise_collapses_analyses_over_token_max(self, map_reduce_llm, mock_writer):
+        """Test that mapped analyses too long for one reduce are collapsed in groups first."""
+        documents = [Document(page_content=f"ticket {i}") for i in range(9)]
+        prompts = summarise_module._map_reduce_prompts("priority")
+        token_max = 3 * len(MOCK_MAP_REDUCE_SUMMARY.split())
+        
+        result = summarise_module._run_sync(summarise_module._map_reduce(
+            map_reduce_llm, documents, *prompts, batch_size=1, writer=mock_writer, token_max=token_max
+        ))
+        
+        # 9 map calls, one collapse call per group of 3 analyses, then the final reduce
+        assert map_reduce_llm.ainvoke.call_count == 9 + 3 + 1
+        messages = mock_writer.get_messages()
+        collapsing = [msg["custom_data"] for msg in messages if "collapsing" in msg.get("custom_data", "")]
+        assert collapsing == ["[dim]collapsing 9 analyses into 3[/dim]"]
+        assert result == MOCK_MAP_REDUCE_SUMMARY
+    
+    def test_summarise_streams_progress_and_reduce(self, map_reduce_llm, small_ticket_dataset, mock_writer):
+        """Test that map progress and reduce chunks are sent to the stream writer."""
+        async def astream(prompt):
+            for chunk in ("Final ", "summary"):
+                yield AIMessage(content=chunk)
+        
+        map_reduce_llm.astream = astream
+        
+        mock_state = {"shared_data": {"test_tickets": small_ticket_dataset}}
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority", memory_key="test_tickets", batch_size=1, state=mock_state)
+        
+        messages = mock_writer.get_messages()
+        progress = [msg["custom_data"] for msg in messages if "mapped " in msg.get("custom_data", "")]
+        assert len(progress) == len(small_ticket_dataset)
+        assert f"mapped {len(small_ticket_dataset)}/{len(small_ticket_dataset)}" in progress[-1]
+        assert [msg["custom_stream"] for msg in messages if "custom_stream" in msg] == ["Final ", "summary"]
+        assert result["messages"][0].content == "Final summary"
+    
+    def test_summarise_with_fake_chat_model(self, fake_chat_model, mock_writer, small_ticket_dataset):
+        """Test the map-reduce end to end against the fake chat model, streaming its reduce answer."""
+        mock_state = {"shared_data": {"one_ticket": small_ticket_dataset[:1]}}
+        
+        with patch.object(summarise_module, 'get_llm', return_value=fake_chat_model):
+            result = get_tool_function(summarise_content_tool)("priority", memory_key="one_ticket", state=mock_state)
+        
+        # The single map call takes the first response and the streamed reduce the second
+        streamed = [msg["custom_stream"] for msg in mock_writer.iter_messages() if "custom_stream" in msg]
+        assert "".join(streamed) == MOCK_LLM_ANALYSIS_RESPONSE
+        assert result["messages"][0].content == MOCK_LLM_ANALYSIS_RESPONSE
+        
+        # The map reply is a copy of a pre-built message; the shared original never gets a run id
+        progress = "\n".join(msg.get("custom_data", "") for msg in mock_writer.iter_messages())
+        assert f"mapped 1/1: {MOCK_LLM_SUMMARY_RESPONSE[:80]}" in progress
+        assert _PREBUILT_MESSAGES[MOCK_LLM_SUMMARY_RESPONSE].id is None
+    
+    def test_summarise_with_custom_fake_responses(self, fake_chat_model_factory, small_ticket_dataset):
+        """Test that the summarise map-reduce returns the reduce answer of a fake with custom responses."""
+        fake = fake_chat_model_factory(["ticket mapped", "final summary"])
+        mock_state = {"shared_data": {"one_ticket": small_ticket_dataset[:1]}}
+        
+        with patch.object(summarise_module, 'get_llm', return_value=fake):
+            result = get_tool_function(summarise_content_tool)("priority", memory_key="one_ticket", state=mock_state)
+        
+        assert result["messages"][0].content == "final summary"
+        assert fake_chat_model_factory(["ticket mapped", "final summary"]) is fake
     
     def test_fallback_to_content_parameter(self):
         """Test fallback to content parameter when memory_key not found."""
-        patch_obj, mock_writer = mock_get_stream_writer_for_summarise()
-        with patch_obj:
-            # Empty state
-            mock_state = {"shared_data": {}}
-            
-            summarise_func = get_tool_function(summarise_content_tool)
-            result = summarise_func("priority", content="test content", memory_key="missing_key", state=mock_state)
-            
-            # Should process as plain text content
-            assert "messages" in result
-            assert len(result["messages"]) == 1
-            # Should contain analysis of the content
-            assert "priority" in result["messages"][0].content.lower()
+        # Empty state
+        mock_state = {"shared_data": {}}
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority", content="test content", memory_key="missing_key", state=mock_state)
+        
+        # Should process as plain text content
+        assert "messages" in result
+        assert len(result["messages"]) == 1
+        # Should contain analysis of the content
+        assert "priority" in result["messages"][0].content.lower()
     
     def test_plain_text_content_processing(self):
         """Test handling of plain text content (not structured tickets)."""
-        patch_obj, mock_writer = mock_get_stream_writer_for_summarise()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "plain_text": "This is some plain text content for analysis"
-                }
+        mock_state = {
+            "shared_data": {
+                "plain_text": "This is some plain text content for analysis"
             }
-            
-            summarise_func = get_tool_function(summarise_content_tool)
-            result = summarise_func("priority", memory_key="plain_text", state=mock_state)
-            
-            # Should process as plain text
-            assert "messages" in result
-            assert len(result["messages"]) == 1
-            # Should contain summary content
-            assert "priority" in result["messages"][0].content.lower()
+        }
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        result = summarise_func("priority", memory_key="plain_text", state=mock_state)
+        
+        # Should process as plain text
+        assert "messages" in result
+        assert len(result["messages"]) == 1
+        # Should contain summary content
+        assert "priority" in result["messages"][0].content.lower()
     
-    @patch('sengy.node.summarise.load_summarize_chain')
-    def test_stream_writer_messages(self, mock_chain_loader, small_ticket_dataset):
+    def test_stream_writer_messages(self, map_reduce_llm, small_ticket_dataset, mock_writer):
         """Test that progress messages are sent to stream writer."""
-        mock_chain = mock_map_reduce_chain(MOCK_MAP_REDUCE_SUMMARY)
-        mock_chain_loader.return_value = mock_chain
-        
-        patch_obj, mock_writer = mock_get_stream_writer_for_summarise()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "test_tickets": small_ticket_dataset
-                }
+        mock_state = {
+            "shared_data": {
+                "test_tickets": small_ticket_dataset
             }
+        }
+        
+        summarise_func = get_tool_function(summarise_content_tool)
+        summarise_func("priority", memory_key="test_tickets", state=mock_state)
+        
+        # Should have sent progress messages
+        messages = mock_writer.get_messages()
+        assert len(messages) > 0
+        
+        # Check for expected message types; newlines keep matches within one message
+        joined = "\n".join(str(msg.get("custom_data", "")) for msg in messages)
+        assert "MAP-REDUCE SUMMARY" in joined
+    
+    def test_structured_llm_cached_until_settings_reload(self):
+        """Test that the bound structured LLM is built once and rebuilt after reload_settings."""
+        with patch.object(summarise_module, 'get_llm') as get_llm, patch('dotenv.load_dotenv'), \
+                patch('sengy.config.SengySettings'), patch('sengy.config._settings'):
+            first = summarise_module._structured_llm()
+            assert summarise_module._structured_llm() is first
+            assert get_llm.call_count == 1
             
-            summarise_func = get_tool_function(summarise_content_tool)
-            summarise_func("priority", memory_key="test_tickets", state=mock_state)
-            
-            # Should have sent progress messages
-            messages = mock_writer.get_messages()
-            assert len(messages) > 0
-            
-            # Check for expected message types
-            message_texts = [msg.get("custom_data", "") for msg in messages]
-            assert any("MAP-REDUCE SUMMARY" in text for text in message_texts)
+            reload_settings()
+            summarise_module._structured_llm()
+            assert get_llm.call_count == 2
+    
+    @patch.object(summarise_module, '_structured_llm')
+    def test_summarise_content_dimensions_json(self, mock_structured_llm):
+        """Test that plain text summaries are returned as indented JSON keyed by dimension."""
+        mock_structured_llm.return_value.invoke.return_value = SummaryModel(dimensions=[
+            DimensionSummary(name="priority", summary="Mostly high"),
+            DimensionSummary(name="risk", summary="Café outage"),
+        ])
+        
+        state = {"messages": [HumanMessage(content="priority,risk"), HumanMessage(content="Some text")]}
+        result = summarise_content(state)
+        
+        content = result["messages"][0].content
+        assert json.loads(content) == {"priority": "Mostly high", "risk": "Café outage"}
+        assert content.startswith('{\n  "priority"')
+
 
 
 class TestMapReduceAnalyzeTickets:
     """Test the analyze_content_tool tool."""
     
-    @patch('sengy.node.analysis.load_summarize_chain')
-    def test_analyze_small_dataset(self, mock_chain_loader, small_ticket_dataset):
+    @pytest.fixture(autouse=True)
+    def mock_writer(self, mock_stream_writer):
+        """Capture what the analysis module sends to the module's shared stream writer."""
+        patch_obj, writer = mock_get_stream_writer_for_analysis(mock_stream_writer)
+        with patch_obj:
+            yield writer
+    
+    @pytest.fixture(autouse=True)
+    def chain_loader(self):
+        """Patch load_summarize_chain once per test, returning the summary chain by default."""
+        with patch.object(analysis_module, 'load_summarize_chain') as loader:
+            loader.return_value = _chain(_CHAIN_SUMMARY)
+            yield loader
+    
+    def test_analyze_small_dataset(self, chain_loader, small_ticket_dataset):
         """Test analysis with small dataset using memory_key."""
-        # Setup mocks
-        mock_chain = mock_map_reduce_chain(MOCK_MAP_REDUCE_ANALYSIS)
-        mock_chain_loader.return_value = mock_chain
+        chain_loader.return_value = _chain(_CHAIN_ANALYSIS)
         
-        patch_obj, mock_writer = mock_get_stream_writer_for_analysis()
-        with patch_obj:
-            # Create mock state with shared data
-            mock_state = {
-                "shared_data": {
-                    "test_tickets": small_ticket_dataset
-                }
+        # Create mock state with shared data
+        mock_state = {
+            "shared_data": {
+                "test_tickets": small_ticket_dataset
             }
-            
-            # Get the underlying function and call it directly
-            analyze_func = get_tool_function(analyze_content_tool)
-            result = analyze_func(["priority", "complexity"], "test_tickets", mock_state)
-            
-            # Verify result structure
-            assert "messages" in result
-            assert len(result["messages"]) == 1
-            assert MOCK_MAP_REDUCE_ANALYSIS in result["messages"][0].content
+        }
+        
+        # Get the underlying function and call it directly
+        analyze_func = get_tool_function(analyze_content_tool)
+        result = analyze_func(["priority", "complexity"], "test_tickets", mock_state)
+        
+        # Verify result structure
+        assert "messages" in result
+        assert len(result["messages"]) == 1
+        assert result["messages"][0].content == MOCK_MAP_REDUCE_ANALYSIS
     
-    @patch('sengy.node.analysis.load_summarize_chain')
-    def test_analyze_large_dataset(self, mock_chain_loader, large_ticket_dataset):
+    def test_analyze_large_dataset(self, chain_loader, large_ticket_dataset):
         """Test analysis with large dataset using memory_key."""
-        mock_chain = mock_map_reduce_chain(MOCK_MAP_REDUCE_ANALYSIS)
-        mock_chain_loader.return_value = mock_chain
+        mock_chain = chain_loader.return_value = _chain(_CHAIN_ANALYSIS)
         
-        patch_obj, mock_writer = mock_get_stream_writer_for_analysis()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "large_tickets": large_ticket_dataset
-                }
+        mock_state = {
+            "shared_data": {
+                "large_tickets": large_ticket_dataset
             }
-            
-            analyze_func = get_tool_function(analyze_content_tool)
-            result = analyze_func(["priority", "complexity", "urgency"], "large_tickets", mock_state)
-            
-            # Verify chain was called
-            mock_chain.invoke.assert_called_once()
-            args = mock_chain.invoke.call_args[0]
-            documents = args[0]
-            
-            # Should process all tickets
-            assert len(documents) == 25
+        }
+        
+        analyze_func = get_tool_function(analyze_content_tool)
+        result = analyze_func(["priority", "complexity", "urgency"], "large_tickets", mock_state)
+        
+        # Verify chain was called
+        mock_chain.invoke.assert_called_once()
+        args = mock_chain.invoke.call_args[0]
+        documents = args[0]
+        
+        # Should process all tickets
+        assert len(documents) == 25
     
-    @patch('sengy.node.analysis.load_summarize_chain')
-    def test_analysis_prompt_templates(self, mock_chain_loader, small_ticket_dataset):
+    def test_analysis_prompt_templates(self, chain_loader, small_ticket_dataset):
         """Test that correct prompt templates are used for analysis."""
-        mock_chain_loader.return_value = mock_map_reduce_chain()
-        
-        patch_obj, mock_writer = mock_get_stream_writer_for_analysis()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "test_tickets": small_ticket_dataset
-                }
+        mock_state = {
+            "shared_data": {
+                "test_tickets": small_ticket_dataset
             }
-            
-            analyze_func = get_tool_function(analyze_content_tool)
-            analyze_func(["priority", "complexity"], "test_tickets", mock_state)
-            
-            # Verify load_summarize_chain was called with correct parameters
-            mock_chain_loader.assert_called_once()
-            call_kwargs = mock_chain_loader.call_args[1]
-            
-            assert call_kwargs['chain_type'] == 'map_reduce'
-            assert 'map_prompt' in call_kwargs
-            assert 'combine_prompt' in call_kwargs
-            assert 'verbose' in call_kwargs
+        }
+        
+        analyze_func = get_tool_function(analyze_content_tool)
+        analyze_func(["priority", "complexity"], "test_tickets", mock_state)
+        
+        # Verify load_summarize_chain was called with correct parameters
+        chain_loader.assert_called_once()
+        call_kwargs = chain_loader.call_args[1]
+        
+        assert call_kwargs['chain_type'] == 'map_reduce'
+        assert 'map_prompt' in call_kwargs
+        assert 'combine_prompt' in call_kwargs
+        assert 'verbose' in call_kwargs
     
-    def test_dimensions_parameter_handling(self):
-        """Test that dimensions parameter is handled correctly."""
-        patch_obj, mock_writer = mock_get_stream_writer_for_analysis()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "empty_tickets": []
-                }
+    def test_analyze_runs_real_chain_with_fake_llm(self, chain_loader, fake_llm, small_ticket_dataset):
+        """Test the real map-reduce chain end to end, driven by the fake LLM."""
+        chain_loader.side_effect = load_summarize_chain
+        mock_state = {"shared_data": {"test_tickets": small_ticket_dataset}}
+        
+        with patch.object(analysis_module, 'get_llm', return_value=fake_llm):
+            result = get_tool_function(analyze_content_tool)(["priority"], "test_tickets", mock_state)
+        
+        # One map response per ticket, then the combine step takes the next one
+        assert len(small_ticket_dataset) == 3
+        assert result["messages"][0].content == MOCK_MAP_REDUCE_ANALYSIS
+    
+    def test_analyze_with_custom_fake_responses(self, chain_loader, fake_llm_factory, small_ticket_dataset):
+        """Test the real chain with custom responses: one map answer per ticket, then the combined answer."""
+        chain_loader.side_effect = load_summarize_chain
+        responses = [f"ticket {i} scored" for i in range(1, len(small_ticket_dataset) + 1)] + ["combined scores"]
+        mock_state = {"shared_data": {"test_tickets": small_ticket_dataset}}
+        
+        with patch.object(analysis_module, 'get_llm', return_value=fake_llm_factory(responses)):
+            result = get_tool_function(analyze_content_tool)(["priority"], "test_tickets", mock_state)
+        
+        assert result["messages"][0].content == "combined scores"
+    
+    @pytest.mark.parametrize("dims", [[], ["single"], ["one", "two", "three"]], ids=["empty", "single", "multiple"])
+    def test_dimensions_parameter_handling(self, dims):
+        """Test that empty, single and multiple dimensions are handled."""
+        mock_state = {
+            "shared_data": {
+                "empty_tickets": []
             }
-            
-            analyze_func = get_tool_function(analyze_content_tool)
-            
-            # Test with different dimension formats
-            result = analyze_func([], "empty_tickets", mock_state)
-            # Should handle empty dimensions list
-            
-            result = analyze_func(["single"], "empty_tickets", mock_state)
-            # Should handle single dimension
-            
-            result = analyze_func(["one", "two", "three"], "empty_tickets", mock_state)
-            # Should handle multiple dimensions
+        }
+        
+        analyze_func = get_tool_function(analyze_content_tool)
+        analyze_func(dims, "empty_tickets", mock_state)
     
-    @patch('sengy.node.analysis.load_summarize_chain')
-    def test_stream_progress_messages(self, mock_chain_loader, large_ticket_dataset):
+    def test_stream_progress_messages(self, large_ticket_dataset, mock_writer):
         """Test progress messages for large dataset analysis."""
-        mock_chain_loader.return_value = mock_map_reduce_chain()
-        
-        patch_obj, mock_writer = mock_get_stream_writer_for_analysis()
-        with patch_obj:
-            mock_state = {
-                "shared_data": {
-                    "large_tickets": large_ticket_dataset
-                }
+        mock_state = {
+            "shared_data": {
+                "large_tickets": large_ticket_dataset
             }
-            
-            analyze_func = get_tool_function(analyze_content_tool)
-            analyze_func(["priority", "complexity"], "large_tickets", mock_state)
-            
-            messages = mock_writer.get_messages()
-            message_texts = [msg.get("custom_data", "") for msg in messages]
-            
-            # Should show processing information
-            assert any("MAP-REDUCE ANALYSIS" in text for text in message_texts)
-            assert any("25" in text for text in message_texts)
-            assert any("2 dimensions" in text for text in message_texts)
\ No newline at end of file
+        }
+        
+        analyze_func = get_tool_function(analyze_content_tool)
+        analyze_func(["priority", "complexity"], "large_tickets", mock_state)
+        
+        joined = "\n".join(str(msg.get("custom_data", "")) for msg in mock_writer.iter_messages())
+        
+        # Should show processing information
+        assert "MAP-REDUCE ANALYSIS" in joined
+        assert "25" in joined
+        assert "2 dimensions" in joined
\ No newline at end of file
@@ -1,13 +1,20 @@
 """
 Test utilities and mocks for testing Jira functionality.
 """
-from typing import Any, Dict, List
-from unittest.mock import Mock, patch
+from collections import deque
+from functools import partial
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+from unittest.mock import AsyncMock, Mock, patch
 
+import langgraph.config
 from langchain.docstore.document import Document
 from langchain_community.chat_models.fake import FakeListChatModel
 from langchain_community.llms.fake import FakeListLLM
 from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import sengy.node.analysis as analysis_module
+import sengy.node.summarise as summarise_module
 
 from .fixtures import (
     MOCK_LLM_ANALYSIS_RESPONSE,
@@ -16,36 +23,54 @@ from .fixtures import (
     MOCK_MAP_REDUCE_SUMMARY,
 )
 
+# Responses the fake models cycle through when none are given
+_DEFAULT_RESPONSES: Tuple[str, ...] = (
+    MOCK_LLM_SUMMARY_RESPONSE,
+    MOCK_LLM_ANALYSIS_RESPONSE,
+    MOCK_MAP_REDUCE_SUMMARY,
+    MOCK_MAP_REDUCE_ANALYSIS,
+)
+
+
+# One validated message per default response; the chat fake hands out copies of these
+_PREBUILT_MESSAGES: Dict[str, AIMessage] = {response: AIMessage(content=response) for response in _DEFAULT_RESPONSES}
+
+
+class _PrebuiltChatModel(FakeListChatModel):
+    """FakeListChatModel that answers default responses with copies of pre-built messages."""
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._call(messages, stop=stop, run_manager=run_manager, **kwargs)
+        prebuilt = _PREBUILT_MESSAGES.get(response)
+        # model_copy skips validation; copying keeps the run id langchain assigns off the shared message
+        message = prebuilt.model_copy() if prebuilt is not None else AIMessage(content=response)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _word_token_ids(text: str) -> List[int]:
+    """Count a token per word, so chains can measure prompts without a tokenizer package."""
+    return list(range(len(text.split())))
+
 
 def create_fake_llm(responses: List[str] = None) -> FakeListLLM:
     """Create a fake LLM with predefined responses."""
-    if responses is None:
-        responses = [
-            MOCK_LLM_SUMMARY_RESPONSE,
-            MOCK_LLM_ANALYSIS_RESPONSE,
-            MOCK_MAP_REDUCE_SUMMARY,
-            MOCK_MAP_REDUCE_ANALYSIS
-        ]
-    return FakeListLLM(responses=responses)
+    responses = list(_DEFAULT_RESPONSES) if responses is None else responses
+    return FakeListLLM(responses=responses, custom_get_token_ids=_word_token_ids)
 
 
 def create_fake_chat_model(responses: List[str] = None) -> FakeListChatModel:
     """Create a fake chat model with predefined responses."""
-    if responses is None:
-        responses = [
-            MOCK_LLM_SUMMARY_RESPONSE,
-            MOCK_LLM_ANALYSIS_RESPONSE, 
-            MOCK_MAP_REDUCE_SUMMARY,
-            MOCK_MAP_REDUCE_ANALYSIS
-        ]
-    return FakeListChatModel(responses=responses)
+    responses = list(_DEFAULT_RESPONSES) if responses is None else responses
+    return _PrebuiltChatModel(responses=responses, custom_get_token_ids=_word_token_ids)
 
 
 class MockStreamWriter:
     """Mock stream writer for testing."""
     
+    __slots__ = ('messages',)
+    
     def __init__(self):
-        self.messages = []
+        self.messages = deque()
     
     def __call__(self, message: Dict[str, Any]):
         """Capture stream messages."""
@@ -53,42 +78,56 @@ class MockStreamWriter:
         
     def get_messages(self) -> List[Dict[str, Any]]:
         """Get all captured messages."""
-        return self.messages
+        return list(self.messages)
+    
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over captured messages without copying them."""
+        return iter(self.messages)
     
     def clear(self):
         """Clear captured messages."""
-        self.messages = []
+        self.messages.clear()
+    
+    def mark(self) -> int:
+        """Position to return to with reset_to()."""
+        return len(self.messages)
+    
+    def reset_to(self, mark: int):
+        """Drop messages captured since mark(), keeping the ones before it."""
+        # A deque has no slice deletion; popping from the right is O(1) per message
+        while len(self.messages) > mark:
+            self.messages.pop()
 
 
-def create_mock_stream_writer() -> MockStreamWriter:
-    """Create a mock stream writer."""
-    return MockStreamWriter()
+# Kept for callers of the old factory name
+create_mock_stream_writer = MockStreamWriter
 
 
-def mock_get_stream_writer():
-    """Create a context manager for mocking get_stream_writer."""
-    mock_writer = create_mock_stream_writer()
-    return patch('langgraph.config.get_stream_writer', return_value=mock_writer), mock_writer
+def _mock_stream_writer(module, mock_writer: MockStreamWriter = None):
+    """Create a context manager for mocking get_stream_writer in module."""
+    if mock_writer is None:
+        mock_writer = create_mock_stream_writer()
+    return patch.object(module, 'get_stream_writer', return_value=mock_writer), mock_writer
 
-def mock_get_stream_writer_for_analysis():
-    """Create a context manager for mocking get_stream_writer in analysis module."""
-    mock_writer = create_mock_stream_writer()
-    return patch('sengy.node.analysis.get_stream_writer', return_value=mock_writer), mock_writer
 
-def mock_get_stream_writer_for_summarise():
-    """Create a context manager for mocking get_stream_writer in summarise module."""
-    mock_writer = create_mock_stream_writer()
-    return patch('sengy.node.summarise.get_stream_writer', return_value=mock_writer), mock_writer
+# Each takes an optional writer and returns (patcher, writer)
+mock_get_stream_writer = partial(_mock_stream_writer, langgraph.config)
+mock_get_stream_writer_for_analysis = partial(_mock_stream_writer, analysis_module)
+mock_get_stream_writer_for_summarise = partial(_mock_stream_writer, summarise_module)
+
+
+# Metadata every ticket Document must carry
+_REQUIRED_METADATA = frozenset({'key', 'status', 'priority', 'issue_type'})
 
 
 def verify_document_structure(doc: Document, expected_key: str = None) -> bool:
     """Verify that a Document has the expected structure."""
-    # Check that it's a Document
+    # Check that it's a Document; that guarantees page_content and metadata
     if not isinstance(doc, Document):
         return False
     
-    # Check required fields
-    if not hasattr(doc, 'page_content') or not hasattr(doc, 'metadata'):
+    # Check specific key first if provided; it is the cheapest to reject on
+    if expected_key and doc.metadata.get('key') != expected_key:
         return False
     
     # Check content exists
@@ -96,36 +135,92 @@ def verify_document_structure(doc: Document, expected_key: str = None) -> bool:
         return False
     
     # Check metadata structure
-    required_metadata = ['key', 'status', 'priority', 'issue_type']
-    for field in required_metadata:
-        if field not in doc.metadata:
-            return False
+    return _REQUIRED_METADATA.issubset(doc.metadata)
+
+
+def verify_documents_structure(docs: List[Document], expected_keys: List[str] = None) -> List[bool]:
+    """
+    Verify a list of Documents with verify_document_structure, pairing each with
+    its entry in expected_keys; a length mismatch raises ValueError.
+    """
+    if expected_keys is None:
+        return [verify_document_structure(doc) for doc in docs]
+    return [verify_document_structure(doc, key) for doc, key in zip(docs, expected_keys, strict=True)]
+
+
+# Marker text for each ticket field; every marker starts a line of the document
+TICKET_FIELD_MARKERS = {
+    'key': 'Key:',
+    'summary': 'Summary:',
+    'status': 'Status:',
+    'priority': 'Priority:',
+    'description': 'Description:',
+    'comments': 'Comments',
+    'labels': 'Labels:',
+    'components': 'Components:'
+}
+
+
+class TicketFieldPresence(NamedTuple):
+    """Which ticket fields appear in document content, in TICKET_FIELD_MARKERS order."""
+    key: bool
+    summary: bool
+    status: bool
+    priority: bool
+    description: bool
+    comments: bool
+    labels: bool
+    components: bool
+
+
+# Line label -> position of its field in TicketFieldPresence
+_FIELD_INDEX_BY_LINE_HEAD = {
+    marker.rstrip(':'): TicketFieldPresence._fields.index(field)
+    for field, marker in TICKET_FIELD_MARKERS.items()
+}
+
+
+def count_ticket_fields_in_content(content: str) -> TicketFieldPresence:
+    """Count which ticket fields are present in document content, classifying each line by its label."""
+    found = [False] * len(TicketFieldPresence._fields)
+    for line in content.splitlines():
+        # "Label: value", or "Comments (n):" for the comment block
+        head = line.partition(':')[0].partition(' (')[0]
+        index = _FIELD_INDEX_BY_LINE_HEAD.get(head)
+        if index is not None:
+            found[index] = True
+    return TicketFieldPresence._make(found)
+
+
+class _FakeChain:
+    """Summarize chain stand-in; only invoke and run exist, and they record their calls."""
     
-    # Check specific key if provided
-    if expected_key and doc.metadata.get('key') != expected_key:
-        return False
+    __slots__ = ('invoke', 'run')
     
-    return True
+    def __init__(self, response: str):
+        self.invoke = Mock(return_value={'output_text': response})
+        self.run = Mock(return_value=response)  # Keep for backward compatibility
+    
+    def reset_mock(self):
+        """Clear recorded calls, keeping the configured responses."""
+        self.invoke.reset_mock()
+        self.run.reset_mock()
 
 
-def count_ticket_fields_in_content(content: str) -> Dict[str, bool]:
-    """Count which ticket fields are present in document content."""
-    fields = {
-        'key': 'Key:' in content,
-        'summary': 'Summary:' in content,
-        'status': 'Status:' in content,
-        'priority': 'Priority:' in content,
-        'description': 'Description:' in content,
-        'comments': 'Comments' in content,
-        'labels': 'Labels:' in content,
-        'components': 'Components:' in content
-    }
-    return fields
+def mock_map_reduce_chain(response: str = MOCK_MAP_REDUCE_SUMMARY) -> _FakeChain:
+    """Create a mock for load_summarize_chain."""
+    return _FakeChain(response)
 
 
-def mock_map_reduce_chain(response: str = MOCK_MAP_REDUCE_SUMMARY):
-    """Create a mock for load_summarize_chain."""
-    mock_chain = Mock()
-    mock_chain.invoke.return_value = {'output_text': response}
-    mock_chain.run.return_value = response  # Keep for backward compatibility
-    return mock_chain
\ No newline at end of file
+def mock_map_reduce_llm(response: str = MOCK_MAP_REDUCE_SUMMARY):
+    """Create a mock chat model for the async map-reduce; every call, streamed or not, returns response."""
+    mock_llm = Mock()
+    mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content=response))
+    mock_llm.get_num_tokens = lambda text: len(_word_token_ids(text))
+    
+    async def astream(prompt):
+        # Stream the whole response as one chunk, recording the call through ainvoke
+        yield await mock_llm.ainvoke(prompt)
+    
+    mock_llm.astream = astream
+    return mock_llm